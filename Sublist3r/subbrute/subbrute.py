@@ -29,6 +29,10 @@ except:
 #The 'multiprocessing' library does not rely upon a Global Interpreter Lock (GIL)
 import multiprocessing
 
+#Optional callable(stage_name) returning a context manager wrapped around each lookup process's work,
+#set by callers that want to profile the forked lookups
+profile_hook = None
+
 #Microsoft compatiablity
 if  sys.platform.startswith('win'):
     #Drop-in replacement,  subbrute + multiprocessing throws exceptions on windows.
@@ -299,6 +303,12 @@ class lookup(multiprocessing.Process):
                     raise e
 
     def run(self):
+        if profile_hook is not None:
+            with profile_hook("subbrute-lookup"):
+                return self.lookup_all()
+        return self.lookup_all()
+
+    def lookup_all(self):
         #This process needs one resolver before it can start looking.
         self.resolver.nameservers += self.get_ns_blocking()
         while True:
@@ -404,7 +414,8 @@ def extract_subdomains(file_name):
     subs_sorted = sorted(subs.keys(), key = lambda x: subs[x], reverse = True)
     return subs_sorted
 
-def print_target(target, record_type = None, subdomains = "names.txt", resolve_list = "resolvers.txt", process_count = 16, output = False, json_output = False, found_subdomains=[],verbose=False):
+#callback (optional) is called with each new result as soon as it is found.
+def print_target(target, record_type = None, subdomains = "names.txt", resolve_list = "resolvers.txt", process_count = 16, output = False, json_output = False, found_subdomains=[],verbose=False, callback=None):
     subdomains_list = []
     results_temp = []
     run(target, record_type, subdomains, resolve_list, process_count)
@@ -417,6 +428,8 @@ def print_target(target, record_type = None, subdomains = "names.txt", resolve_l
         if result not in found_subdomains:
             if verbose:
                 print(result)
+            if callback:
+                callback(result)
             subdomains_list.append(result)
 
     return  set(subdomains_list)
@@ -542,7 +555,11 @@ def check_open(input_file):
 #All processes need to die, we don't want to leave zombies.
 def signal_init():
     #Escliate signal to prevent zombies.
-    signal.signal(signal.SIGINT, killproc)
+    try:
+        signal.signal(signal.SIGINT, killproc)
+    except ValueError:
+        #Not the main thread (subbrute is embedded in another program), leave the caller's handlers alone.
+        return
     try:
         signal.signal(signal.SIGTSTP, killproc)
         signal.signal(signal.SIGQUIT, killproc)
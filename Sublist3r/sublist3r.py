@@ -17,6 +17,12 @@ import socket
 import json
 from collections import Counter
 
+# Python 2.x and 3.x compatiablity for queue exceptions
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
 # external modules
 from subbrute import subbrute
 import dns.resolver
@@ -38,9 +44,26 @@ try:
 except:
     pass
 
+# Optional callable(stage_name) returning a context manager wrapped around each engine process's work;
+# set by callers that want to profile the engine processes. It must be picklable.
+profile_hook = None
+
+# Optional callable(engine_name) called before every request an engine sends, which may block;
+# set by callers that run several enumerations at once and want to pace each engine across all of them
+request_gate = None
+
 # Check if we are running this on windows platform
 is_windows = sys.platform.startswith('win')
 
+# Callers may run main() on a worker thread, and a process forked from a threaded program can
+# inherit a lock another thread was holding; engines start from a fresh interpreter instead
+if 'forkserver' in multiprocessing.get_all_start_methods():
+    mp_context = multiprocessing.get_context('forkserver')
+    # The fork server imports this module once, so each engine does not import it again
+    mp_context.set_forkserver_preload(['__main__', 'sublist3r'])
+else:
+    mp_context = multiprocessing.get_context('spawn')
+
 # Console Colors
 if is_windows:
     # Windows deserves coloring too :D
@@ -256,15 +279,48 @@ class enumratorBase(object):
         return self.subdomains
 
 
-class enumratorBaseThreaded(multiprocessing.Process, enumratorBase):
+class liveList(list):
+    """ list that also pushes every appended subdomain onto a queue, so results can be consumed while an engine runs """
+    def __init__(self, q, items=None):
+        list.__init__(self, items or [])
+        self.q = q
+
+    def append(self, item):
+        list.append(self, item)
+        self.q.put(item)
+
+
+class enumratorBaseThreaded(mp_context.Process, enumratorBase):
+    # attribute holding the engine's results, streamed to live_q when set
+    live_attr = 'subdomains'
+
     def __init__(self, base_url, engine_name, domain, subdomains=None, q=None, silent=False, verbose=True):
         subdomains = subdomains or []
         enumratorBase.__init__(self, base_url, engine_name, domain, subdomains, silent=silent, verbose=verbose)
-        multiprocessing.Process.__init__(self)
+        mp_context.Process.__init__(self)
         self.q = q
+        self.live_q = None
+        # captured here so the hooks travel with the engine into its process
+        self.request_gate = request_gate
+        self.profile_hook = profile_hook
         return
 
     def run(self):
+        if self.profile_hook is not None:
+            with self.profile_hook("enumeration-" + self.engine_name.lower()):
+                return self.collect()
+        return self.collect()
+
+    def collect(self):
+        if self.request_gate is not None:
+            send = self.session.request
+
+            def gated_request(*args, **kwargs):
+                self.request_gate(self.engine_name)
+                return send(*args, **kwargs)
+            self.session.request = gated_request
+        if self.live_q is not None:
+            setattr(self, self.live_attr, liveList(self.live_q, getattr(self, self.live_attr)))
         domain_list = self.enumerate()
         for domain in domain_list:
             self.q.append(domain)
@@ -595,6 +651,9 @@ class NetcraftEnum(enumratorBaseThreaded):
 
 
 class DNSdumpster(enumratorBaseThreaded):
+    # only hosts that resolve are reported
+    live_attr = 'live_subdomains'
+
     def __init__(self, domain, subdomains=None, q=None, silent=False, verbose=True):
         subdomains = subdomains or []
         base_url = 'https://dnsdumpster.com/'
@@ -881,14 +940,31 @@ class portscan():
             t.start()
 
 
-def main(domain, threads, savefile, ports, silent, verbose, enable_bruteforce, engines):
+def main(domain, threads, savefile, ports, silent, verbose, enable_bruteforce, engines, callback=None):
+    """ Enumerate subdomains of domain and return them as a sorted list.
+
+    When callback is given it is called once with every unique subdomain as soon as
+    an engine (or the bruteforce module) finds it, while enumeration is still running.
+    """
     bruteforce_list = set()
     search_list = set()
 
     if is_windows:
         subdomains_queue = list()
     else:
-        subdomains_queue = multiprocessing.Manager().list()
+        subdomains_queue = mp_context.Manager().list()
+
+    # live results channel from the engine processes to the callback
+    live_queue = None
+    if callback and not is_windows:
+        live_queue = mp_context.Queue()
+    reported = set()
+
+    def report(subdomain):
+        subdomain = subdomain.strip()
+        if callback and subdomain and subdomain not in reported:
+            reported.add(subdomain)
+            callback(subdomain)
 
     # Check Bruteforce Status
     if enable_bruteforce or enable_bruteforce is None:
@@ -942,13 +1018,21 @@ def main(domain, threads, savefile, ports, silent, verbose, enable_bruteforce, e
     # Start the engines enumeration
     enums = [enum(domain, [], q=subdomains_queue, silent=silent, verbose=verbose) for enum in chosenEnums]
     for enum in enums:
+        enum.live_q = live_queue
         enum.start()
+    if live_queue is not None:
+        while any(enum.is_alive() for enum in enums) or not live_queue.empty():
+            try:
+                report(live_queue.get(timeout=0.5))
+            except queue.Empty:
+                pass
     for enum in enums:
         enum.join()
 
     subdomains = set(subdomains_queue)
     for subdomain in subdomains:
         search_list.add(subdomain)
+        report(subdomain)
 
     if enable_bruteforce:
         if not silent:
@@ -960,9 +1044,11 @@ def main(domain, threads, savefile, ports, silent, verbose, enable_bruteforce, e
         process_count = threads
         output = False
         json_output = False
-        bruteforce_list = subbrute.print_target(parsed_domain.netloc, record_type, subs, resolvers, process_count, output, json_output, search_list, verbose)
+        bruteforce_list = subbrute.print_target(parsed_domain.netloc, record_type, subs, resolvers, process_count, output, json_output, search_list, verbose, callback=report)
 
     subdomains = search_list.union(bruteforce_list)
+    for subdomain in subdomains:
+        report(subdomain)
 
     if subdomains:
         subdomains = sorted(subdomains, key=subdomain_sorting_key)
@@ -0,0 +1,286 @@
+import os  # Paths and temporary folders for benchmark outputs
+import sys  # Silences the checker's console output inside benchmark cases
+import csv  # Reads the checker's output back for the correctness check
+import json  # Optional machine-readable report
+import time  # Wall-clock timing of each case
+import random  # Deterministic assignment of hostnames to server profiles
+import socket  # Loopback listeners, resets and refused ports
+import asyncio  # Serves the whole farm from one event loop
+import argparse  # Parses command-line arguments
+import resource  # Peak RSS of each benchmark case
+import tempfile  # Scratch folder for the result CSVs
+import itertools  # Cartesian product of the benchmark matrix
+import importlib.util  # Loads finder_v1.7.py, whose name is not importable
+import multiprocessing  # Runs the farm and every case in processes of their own
+import queue  # Empty exception while waiting for a case's report
+import urllib3  # Points probe connections at the farm's ports
+
+FINDER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'finder_v1.7.py')
+
+# Server profiles and the row the checker must produce for each: (Status Code, Accessible)
+EXPECTED = {
+    "fast": ("200", "Yes"),
+    "slow": ("200", "Yes"),
+    "large": ("200", "Yes"),
+    "redirect": ("200", "Yes"),
+    "notfound": ("404", "No"),
+    "hang": ("N/A", "No"),
+    "reset": ("N/A", "No"),
+    "refused": ("N/A", "No"),
+    "nxdomain": ("NXDOMAIN", "No"),
+}
+
+# Default share of hosts per profile, in percent
+DEFAULT_MIX = "fast=55,slow=15,large=5,redirect=10,notfound=5,hang=0.5,reset=4,refused=3,nxdomain=2.5"
+
+# Every profile listens on its own loopback address, so a connection's target IP names its profile
+FARM_NETWORK = "127.0.10."
+
+def parse_mix(text):
+    """Parse PROFILE=WEIGHT pairs into a dict of weights."""
+    mix = {}
+    for pair in text.split(","):
+        name, _, weight = pair.partition("=")
+        name = name.strip()
+        if name not in EXPECTED:
+            raise argparse.ArgumentTypeError(f"unknown profile '{name}' (choose from {', '.join(EXPECTED)})")
+        mix[name] = float(weight)
+    return mix
+
+def assign_profiles(count, mix, seed):
+    """Map `count` fake hostnames to server profiles in proportion to `mix`."""
+    rng = random.Random(seed)
+    names = list(mix)
+    profiles = rng.choices(names, weights=[mix[name] for name in names], k=count)
+    # Hosts are spread over many parent domains, as in a real list
+    return {f"h{index}.s{index % 97}.farm.test": profile for index, profile in enumerate(profiles)}
+
+class FarmServer:
+    """The request handler behind every listener of the farm, one behaviour per profile."""
+
+    def __init__(self, slow_ms, large_kb, redirects):
+        self.slow = slow_ms / 1000
+        self.large_body = b"x" * (large_kb * 1024)
+        self.redirects = redirects
+
+    @staticmethod
+    def response(status, reason, body=b"", headers=()):
+        head = [f"HTTP/1.1 {status} {reason}", f"Content-Length: {len(body)}", "Content-Type: text/html", "Connection: close"]
+        head += list(headers)
+        return ("\r\n".join(head) + "\r\n\r\n").encode() + body
+
+    async def handle(self, profile, reader, writer):
+        try:
+            request = await reader.readuntil(b"\r\n\r\n")
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            writer.close()
+            return
+        path = request.split(b" ", 2)[1].decode(errors="replace")
+
+        if profile == "hang":
+            # Hold the connection open without answering until the client gives up
+            await reader.read()
+            writer.close()
+            return
+        if profile == "reset":
+            # SO_LINGER with a zero timeout turns close() into a TCP reset
+            sock = writer.get_extra_info("socket")
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, b"\x01\x00\x00\x00\x00\x00\x00\x00")
+            writer.transport.abort()
+            return
+
+        body = b"<html><body>farm</body></html>"
+        if profile == "slow":
+            await asyncio.sleep(self.slow)
+            payload = self.response(200, "OK", body)
+        elif profile == "large":
+            payload = self.response(200, "OK", self.large_body)
+        elif profile == "notfound":
+            payload = self.response(404, "Not Found", body)
+        elif profile == "redirect" and path.count("/r") < self.redirects:
+            # A relative chain of `redirects` hops that stays on the same host
+            payload = self.response(301, "Moved Permanently", headers=[f"Location: {path.rstrip('/')}/r"])
+        else:
+            payload = self.response(200, "OK", body)
+        try:
+            writer.write(payload)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        writer.close()
+
+def run_farm(profiles, slow_ms, large_kb, redirects, ready):
+    """Farm process entry point: listen for every profile and report {profile: (ip, port)} on `ready`."""
+
+    async def serve():
+        handler = FarmServer(slow_ms, large_kb, redirects)
+        addresses, servers = {}, []
+        for index, profile in enumerate(profiles, start=1):
+            ip = FARM_NETWORK + str(index)
+            if profile == "refused":
+                # Reserve a port and close it again: connections there are refused at once
+                with socket.socket() as sock:
+                    sock.bind((ip, 0))
+                    addresses[profile] = (ip, sock.getsockname()[1])
+                continue
+            server = await asyncio.start_server(lambda r, w, p=profile: handler.handle(p, r, w), ip, 0, backlog=4096)
+            servers.append(server)
+            addresses[profile] = (ip, server.sockets[0].getsockname()[1])
+        ready.put(addresses)
+        await asyncio.Event().wait()
+
+    asyncio.run(serve())
+
+def load_finder():
+    """Import finder_v1.7.py as a module."""
+    spec = importlib.util.spec_from_file_location("finder", FINDER_PATH)
+    finder = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(finder)
+    return finder
+
+def route_to_farm(finder, ports):
+    """Send probe connections for farm addresses to the farm's ports instead of port 80.
+
+    Names resolve through the checker's own DNS cache, so only the port needs rewriting: at the
+    socket level for requests and in the aiohttp resolver for the async engine.
+    """
+    original = urllib3.util.connection.create_connection
+
+    def create_connection(address, *args, **kwargs):
+        host, port = address
+        return original((host, ports.get(host, port)), *args, **kwargs)
+
+    urllib3.util.connection.create_connection = create_connection
+
+    if finder.aiohttp is not None:
+        class FarmResolver(finder.CachedResolver):
+            async def resolve(self, host, port=0, family=socket.AF_INET):
+                answers = await super().resolve(host, port, family)
+                for answer in answers:
+                    answer["port"] = ports.get(answer["host"], answer["port"])
+                return answers
+
+        finder.CachedResolver = FarmResolver
+
+def run_case(case, hosts, addresses, options, results):
+    """Case process entry point: scan the farm once and put the measurements on `results`."""
+    quiet = open(os.devnull, 'w') if not options["verbose"] else None
+    if quiet is not None:
+        sys.stdout = sys.stderr = quiet
+    finder = load_finder()
+    route_to_farm(finder, {ip: port for ip, port in addresses.values()})
+
+    # Every name is answered from the DNS cache, so the run never leaves the machine
+    expires = time.time() + 86400
+    for hostname, profile in hosts.items():
+        if profile == "nxdomain":
+            finder.DNS_CACHE.put(hostname, None, expires)
+        else:
+            finder.DNS_CACHE.put(hostname, {"A": addresses[profile][0], "AAAA": "", "CNAME": ""}, expires)
+
+    settings = finder.ProbeSettings(case["mode"], connect_timeout=options["connect_timeout"], read_timeout=options["read_timeout"])
+    limiter = finder.AdaptiveConcurrency(case["concurrency"], 5, options["max_concurrency"]) if case["adaptive"] else None
+    with tempfile.TemporaryDirectory() as scratch:
+        output_file = os.path.join(scratch, "results.csv")
+        finder.METRICS.reset()
+        started = time.monotonic()
+        scan_settings = finder.ScanSettings(case["concurrency"], case["engine"], options["resolve_workers"], limiter=limiter)
+        finder.check_subdomains_concurrently(list(hosts), output_file, None, scan_settings, settings)
+        elapsed = time.monotonic() - started
+        with open(output_file, newline='', encoding='utf-8') as file:
+            rows = list(csv.DictReader(file))
+
+    seen, wrong = set(), []
+    duplicates = 0
+    for row in rows:
+        hostname = row["Subdomain"]
+        if hostname in seen:
+            duplicates += 1
+            continue
+        seen.add(hostname)
+        expected = EXPECTED[hosts[hostname]]
+        if (row["Status Code"], row["Accessible"]) != expected:
+            wrong.append(f"{hostname} ({hosts[hostname]}): got {row['Status Code']}/{row['Accessible']}, expected {'/'.join(expected)}")
+
+    probe = finder.METRICS.summary()["phases"].get("probe", {})
+    results.put(dict(case, hosts=len(hosts), seconds=round(elapsed, 3), hosts_per_second=round(len(hosts) / elapsed, 1),
+                     p50_ms=round(probe.get("p50", 0) * 1000, 1), p99_ms=round(probe.get("p99", 0) * 1000, 1),
+                     # ru_maxrss is in kilobytes on Linux
+                     peak_rss_mb=round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+                     correct=len(seen) - len(wrong), missing=len(hosts) - len(seen), duplicates=duplicates, mismatches=wrong[:10]))
+
+def print_report(reports):
+    """Print one line per case."""
+    print(f"{'engine':<7} {'mode':<8} {'conc':>9} {'hosts':>6} {'seconds':>8} {'hosts/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'RSS MB':>7}  correct")
+    for report in reports:
+        concurrency = f"{'~' if report['adaptive'] else ''}{report['concurrency']}"
+        print(f"{report['engine']:<7} {report['mode']:<8} {concurrency:>9} {report['hosts']:>6} {report['seconds']:>8} {report['hosts_per_second']:>8} "
+              f"{report['p50_ms']:>8} {report['p99_ms']:>8} {report['peak_rss_mb']:>7}  {report['correct']}/{report['hosts']}"
+              + (f" ({report['missing']} missing)" if report['missing'] else "")
+              + (f" ({report['duplicates']} duplicates)" if report['duplicates'] else ""))
+        for mismatch in report["mismatches"]:
+            print(f"    {mismatch}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the accessibility checker against a farm of local HTTP servers (offline, Linux).")
+    parser.add_argument("-n", "--hosts", type=int, help="Number of fake hostnames to check (default: 2000).", default=2000)
+    parser.add_argument("--mix", type=parse_mix, help=f"Percentage of hosts per server profile (default: {DEFAULT_MIX}).", default=DEFAULT_MIX)
+    parser.add_argument("--engines", help="Comma-separated probe engines to benchmark (default: thread,async).", default="thread,async")
+    parser.add_argument("--modes", help="Comma-separated probe modes to benchmark (default: full).", default="full")
+    parser.add_argument("-T", "--concurrency", help="Comma-separated concurrency levels to benchmark (default: 100).", default="100")
+    parser.add_argument("--adaptive", action="store_true", help="Also run every case with adaptive concurrency starting at -T.")
+    parser.add_argument("--max-concurrency", type=int, help="Upper bound for --adaptive cases (default: 1000).", default=1000)
+    parser.add_argument("--resolve-workers", type=int, help="Lookups in flight in the resolve stage (default: 200).", default=200)
+    parser.add_argument("--connect-timeout", type=float, help="Connect deadline for headers mode (default: 5).", default=5)
+    parser.add_argument("--read-timeout", type=float, help="Read deadline for headers mode (default: 10).", default=10)
+    parser.add_argument("--slow-ms", type=int, help="Response delay of the 'slow' profile in milliseconds (default: 250).", default=250)
+    parser.add_argument("--large-kb", type=int, help="Body size of the 'large' profile in kilobytes (default: 1024).", default=1024)
+    parser.add_argument("--redirects", type=int, help="Length of the 'redirect' profile's redirect chain (default: 3).", default=3)
+    parser.add_argument("--repeat", type=int, help="Runs of every case (default: 1).", default=1)
+    parser.add_argument("--seed", type=int, help="Seed for assigning hostnames to profiles (default: 1).", default=1)
+    parser.add_argument("--json", metavar="FILE", help="Also write every case's measurements to FILE as JSON.")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Show the checker's own output during each case.")
+    args = parser.parse_args()
+
+    # Spawned processes start clean, so each case's peak RSS is its own
+    context = multiprocessing.get_context("spawn")
+    hosts = assign_profiles(args.hosts, args.mix, args.seed)
+    ready = context.Queue()
+    farm = context.Process(target=run_farm, args=(list(args.mix), args.slow_ms, args.large_kb, args.redirects, ready), daemon=True)
+    farm.start()
+    addresses = ready.get()
+    counts = {profile: list(hosts.values()).count(profile) for profile in args.mix}
+    print(f"Farm of {len(addresses)} server profiles on {FARM_NETWORK}0/24: " + ", ".join(f"{profile} {count}" for profile, count in counts.items()))
+
+    options = {"verbose": args.verbose, "connect_timeout": args.connect_timeout, "read_timeout": args.read_timeout,
+               "max_concurrency": args.max_concurrency, "resolve_workers": args.resolve_workers}
+    cases = [{"engine": engine, "mode": mode, "concurrency": int(concurrency), "adaptive": adaptive}
+             for engine, mode, concurrency, adaptive in itertools.product(args.engines.split(","), args.modes.split(","), args.concurrency.split(","),
+                                                                        (False, True) if args.adaptive else (False,))]
+    reports = []
+    try:
+        for case in cases:
+            for _ in range(args.repeat):
+                results = context.Queue()
+                process = context.Process(target=run_case, args=(case, hosts, addresses, options, results))
+                process.start()
+                print(f"Running {case['engine']} engine, {case['mode']} probes, concurrency {case['concurrency']}{' (adaptive)' if case['adaptive'] else ''}...", flush=True)
+                report = None
+                while report is None and (process.is_alive() or not results.empty()):
+                    try:
+                        report = results.get(timeout=1)
+                    except queue.Empty:
+                        continue
+                process.join()
+                if report is None:
+                    print(f"    case failed (exit code {process.exitcode})")
+                else:
+                    reports.append(report)
+    finally:
+        farm.terminate()
+
+    print()
+    print_report(reports)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump(reports, file, indent=2)
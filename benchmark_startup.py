@@ -0,0 +1,114 @@
+import os  # Paths of the checker and the scratch files
+import sys  # The interpreter every case runs with
+import json  # Optional machine-readable report
+import time  # Wall-clock timing of each run
+import argparse  # Parses command-line arguments
+import tempfile  # Scratch folder for the small scan's input and output
+import statistics  # Median of the repeated runs
+import subprocess  # Runs every case in a fresh interpreter
+
+FINDER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'finder_v1.7.py')
+LAUNCHER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'finder.py')
+
+# Loads the checker as a module without running its command line, the way benchmark_finder.py does
+IMPORT_SNIPPET = ("import importlib.util, sys; spec = importlib.util.spec_from_file_location('finder', sys.argv[1]); "
+                  "spec.loader.exec_module(importlib.util.module_from_spec(spec))")
+
+# An IP literal needs no DNS lookup and, with nothing on port 80, is refused at once
+SMALL_SCAN_HOSTS = ["127.0.0.1"]
+
+def case_commands(scratch, scan_list=None):
+    """Return the interpreter arguments of every case, starting with the bare interpreter they are measured against."""
+    if scan_list is None:
+        scan_list = os.path.join(scratch, "hosts.txt")
+        with open(scan_list, 'w', encoding='utf-8') as file:
+            file.write("\n".join(SMALL_SCAN_HOSTS) + "\n")
+    return {
+        "python": ["-c", "pass"],
+        "import": ["-c", IMPORT_SNIPPET, FINDER_PATH],
+        # Run as a script, finder_v1.7.py is compiled from source every time
+        "script": [FINDER_PATH, "--help"],
+        "help": [LAUNCHER_PATH, "--help"],
+        "scan": [LAUNCHER_PATH, "-t", scan_list, "-o", os.path.join(scratch, "results.csv")],
+    }
+
+def wall_times(arguments, runs, cwd):
+    """Run the interpreter with `arguments` `runs` times and return each run's wall time in milliseconds."""
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, *arguments], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, cwd=cwd)
+        times.append((time.perf_counter() - started) * 1000)
+    return times
+
+def import_times(arguments, cwd):
+    """Run once under -X importtime and return (depth, module, self us, cumulative us) for every import, in order."""
+    completed = subprocess.run([sys.executable, "-X", "importtime", *arguments], stdout=subprocess.DEVNULL,
+                               stderr=subprocess.PIPE, text=True, cwd=cwd)
+    imports = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or line.endswith("imported package"):
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        # Nested imports are indented by two spaces per level after the column's single space
+        imports.append(((len(name) - len(name.lstrip()) - 1) // 2, name.strip(), int(own), int(cumulative)))
+    return imports
+
+def measure(commands, runs, cwd):
+    """Measure every case; imports the bare interpreter also makes are left out of a case's import time."""
+    baseline_modules = {name for _, name, _, _ in import_times(commands["python"], cwd)}
+    baseline_ms = statistics.median(wall_times(commands["python"], runs, cwd))
+    reports = []
+    for case, arguments in commands.items():
+        median_ms = baseline_ms if case == "python" else statistics.median(wall_times(arguments, runs, cwd))
+        imports = [entry for entry in import_times(arguments, cwd) if entry[1] not in baseline_modules]
+        # Self times add up without double counting, and grouping them by top-level package
+        # charges a lazily imported package fully, wherever it was first touched
+        packages = {}
+        for _, name, own, _ in imports:
+            package = name.split(".")[0]
+            packages[package] = packages.get(package, 0) + own
+        reports.append({"case": case, "wall_ms": round(median_ms, 1), "overhead_ms": round(median_ms - baseline_ms, 1),
+                        "import_ms": round(sum(packages.values()) / 1000, 1), "modules": len(imports),
+                        "packages": {package: round(own / 1000, 1) for package, own in sorted(packages.items(), key=lambda item: -item[1])}})
+    return reports
+
+def print_report(reports, top):
+    """Print one line per case, then the packages each case spends the most import time on."""
+    print(f"{'case':<8} {'wall ms':>8} {'overhead ms':>12} {'import ms':>10} {'modules':>8}")
+    for report in reports:
+        print(f"{report['case']:<8} {report['wall_ms']:>8} {report['overhead_ms']:>12} {report['import_ms']:>10} {report['modules']:>8}")
+    for report in reports:
+        if report["case"] == "python" or not report["packages"]:
+            continue
+        print(f"\nSlowest packages imported by the {report['case']} case:")
+        for package, ms in list(report["packages"].items())[:top]:
+            print(f"    {ms:>7} ms  {package}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure the checker's startup: wall time against a bare interpreter and a -X importtime breakdown.")
+    parser.add_argument("-n", "--runs", type=int, help="Runs of every case; the median is reported (default: 10).", default=10)
+    parser.add_argument("-t", "--textfile", help="Subdomain list for the scan case (default: a single IP literal that needs no DNS).")
+    parser.add_argument("--top", type=int, help="Slowest packages listed per case (default: 10).", default=10)
+    parser.add_argument("--budget", type=float, help="Exit with status 1 when the import or help case takes this many milliseconds longer than a bare interpreter (default: 100).", default=100)
+    parser.add_argument("--json", metavar="FILE", help="Also write every case's measurements to FILE as JSON.")
+    args = parser.parse_args()
+
+    if sys.dont_write_bytecode:
+        print("PYTHONDONTWRITEBYTECODE is set, so every case recompiles the checker; unset it for representative numbers.\n")
+    with tempfile.TemporaryDirectory() as scratch:
+        commands = case_commands(scratch, args.textfile and os.path.abspath(args.textfile))
+        # Running inside the scratch folder keeps the checker's default outputs out of the working tree
+        reports = measure(commands, max(1, args.runs), scratch)
+
+    print_report(reports, args.top)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump(reports, file, indent=2)
+
+    # Only startup itself is held to the budget: any scan imports requests and dnspython,
+    # and the script case pays for compiling the checker every time
+    over = [report["case"] for report in reports if report["case"] in ("import", "help") and report["overhead_ms"] > args.budget]
+    if over:
+        print(f"\nOver the {args.budget:g} ms startup budget: {', '.join(over)}")
+        sys.exit(1)
@@ -0,0 +1,14 @@
+import os  # Locates finder_v1.7.py next to this launcher
+import sys  # Registers the loaded checker under its module name
+import importlib.util  # Loads finder_v1.7.py, whose name is not importable
+
+# Python caches the bytecode of modules it imports but never of the script it runs, so starting
+# the checker through this launcher skips recompiling finder_v1.7.py on every invocation
+spec = importlib.util.spec_from_file_location("finder", os.path.join(os.path.dirname(os.path.abspath(__file__)), 'finder_v1.7.py'))
+finder = importlib.util.module_from_spec(spec)
+# Worker processes started with spawn import "finder" to find their target and must get the checker
+sys.modules["finder"] = finder
+spec.loader.exec_module(finder)
+
+if __name__ == "__main__":
+    finder.main()
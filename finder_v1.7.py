@@ -1,23 +1,96 @@
 import os  # Provides functions to interact with the operating system
 import csv  # Handles reading and writing CSV files
 import sys  # Access system-specific parameters and functions
-import requests  # Simplifies making HTTP requests
-from tqdm import tqdm  # Displays progress bars for loops
-import subprocess  # Runs subprocesses and interacts with system commands
+import importlib.util  # Defers loading the heavy dependencies until a stage uses them
+import types  # Base class of the lazy module stand-ins
 import time  # Provides time-related functions
-from concurrent.futures import ThreadPoolExecutor  # Manages multithreading
+import dns  # dnspython; its __init__ is tiny and the submodules used below load lazily
+import ipaddress  # Recognises IP literals, which need no DNS lookup and have no parent domain for a wildcard
+import socket  # Address families for cached DNS answers, the browser proxy and probe deadlines
+import select  # Relays bytes in both directions through the browser proxy
+import socketserver  # Serves the browser proxy
+import json  # Persists the DNS cache to disk
+import signal  # Drains the pipeline cleanly on SIGINT/SIGTERM
+import hashlib  # Hashes response content into cluster fingerprints
+import gzip  # Reads gzipped subdomain lists and writes gzipped outputs
+import io  # Buffered reads of zstd-compressed outputs
+import struct  # Encodes Arrow IPC messages
+import itertools  # Chains a peeked entry back onto its input stream
+import heapq  # Orders hosts deferred by the rate limiter and pending probe deadlines
+import zlib  # Stable hash that assigns hosts to shards
+import contextlib  # Context managers for probe deadlines and in-flight gauges
+import contextvars  # Keeps wildcard baseline probes out of the run's metrics
+import array  # Packed offsets and index of the compact host set
+import functools  # Binds the profiler settings handed to Sublist3r's engine processes
+import atexit  # Writes --profile output however the run ends
 import re  # Adds regular expressions for pattern matching and validation
+import math  # Sizes the Bloom filter used to dedupe huge inputs
 import argparse  # Parses command-line arguments
-from selenium import webdriver  # Selenium WebDriver for browser automation
-from selenium.webdriver.chrome.service import Service  # Manages ChromeDriver service for Selenium
-from selenium.webdriver.common.by import By  # Defines various methods to locate elements
-from selenium.webdriver.chrome.options import Options  # Configures Chrome options for Selenium
 from colorama import Fore, Style  # Adds color formatting for terminal output
 import platform  # To identify the operating system
 import shutil  # For file operations
-import urllib.request  # For downloading files
-import zipfile  # For extracting ChromeDriver
-import subprocess  # To install dependencies using system commands
+from urllib.parse import urljoin, urlsplit  # Resolves redirect locations and proxied request targets
+import threading  # Runs the screenshot worker pool and watches probe deadlines
+import queue  # Hands captures to the screenshot workers
+import base64  # Decodes screenshots returned by the DevTools protocol
+
+class LazyModule(types.ModuleType):
+    """Stand-in for a module that imports it on first attribute access.
+
+    The import goes through importlib and its per-module lock, so stage threads reaching a
+    module at the same moment all get it fully loaded.
+    """
+
+    def __getattr__(self, attr):
+        module = importlib.import_module(self.__name__)
+        # Later lookups find the module's attributes here without coming back to __getattr__
+        self.__dict__.update(module.__dict__)
+        return getattr(module, attr)
+
+def lazy_import(name):
+    """Return module `name`, imported on first use, or None when a top-level package is not installed.
+
+    `--help`, and runs that never reach a stage, skip the cost of importing what the stage needs.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    if "." not in name and importlib.util.find_spec(name) is None:
+        return None
+    module = LazyModule(name)
+    parent, _, child = name.rpartition(".")
+    if parent in sys.modules:
+        # A regular import binds submodules on their package, and dns.resolver.NXDOMAIN relies on it
+        setattr(sys.modules[parent], child, module)
+    return module
+
+# Standard library modules only some runs need
+asyncio = lazy_import("asyncio")  # Runs the DNS resolve stage and the asynchronous probe engine
+futures = lazy_import("concurrent.futures")  # Shares wildcard baseline probes and runs handoff threads
+uuid = lazy_import("uuid")  # Generates random labels for wildcard baseline probes
+sqlite3 = lazy_import("sqlite3")  # Stores probe results between runs
+multiprocessing = lazy_import("multiprocessing")  # Runs shard processes for --workers
+cProfile = lazy_import("cProfile")  # Per-stage CPU profiles for --profile
+pstats = lazy_import("pstats")  # Merges and saves the per-stage CPU profiles
+tracemalloc = lazy_import("tracemalloc")  # Per-stage memory snapshots for --profile
+
+requests = lazy_import("requests")  # Simplifies making HTTP requests
+urllib3 = lazy_import("urllib3")  # Lets requests connect to cached addresses and probe deadlines reach its sockets
+tqdm = lazy_import("tqdm")  # Displays progress bars for loops
+idna = lazy_import("idna")  # Encodes internationalized hostnames (installed with requests)
+lazy_import("dns.asyncresolver")  # Asynchronous DNS lookups for the resolve stage
+lazy_import("dns.resolver")  # DNS exception types
+lazy_import("dns.rdatatype")  # DNS record type constants
+webdriver = lazy_import("selenium.webdriver")  # Selenium WebDriver for browser automation
+selenium_exceptions = lazy_import("selenium.common.exceptions")  # TimeoutException when a page load runs out of time
+
+# aiohttp is only needed for the async engine, so a missing install is not fatal
+aiohttp = lazy_import("aiohttp")  # Asynchronous HTTP client with connection pooling
+
+# pyarrow is only needed for Parquet output; Arrow IPC output is written without it
+pyarrow = lazy_import("pyarrow")  # Converts the result stream to Parquet
+
+# zstandard is only needed for .zst outputs
+zstandard = lazy_import("zstandard")  # zstd compression of JSONL and Arrow outputs
 
 ascii_art = """
                                                                                   
@@ -41,7 +114,6 @@ S:::::::::::::::SS F::::::::FF   A:::::A                 A:::::A CCC::::::::::::
                                     Subdomain Finder and Accessibility Checker  
                                                                     v1.7 created by Sneakywarwolf
 """
-print(Fore.MAGENTA + ascii_art + Style.RESET_ALL)
 
 def list_files_in_directory():
     """List files in the current working directory."""
@@ -53,78 +125,2409 @@ def print_status(message):
     """Print a status message with a timestamp."""
     print(f"[{time.strftime('%H:%M:%S')}] {message}")
 
-def run_sublist3r(domain):
-    """Run Sublist3r to enumerate subdomains with a dynamic progress bar."""
-    sublist3r_path = os.path.join('Sublist3r', 'sublist3r.py')
-    if not os.path.exists(sublist3r_path):
+# The bundled Sublist3r checkout, imported in-process instead of run as a subprocess
+SUBLIST3R_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Sublist3r')
+
+# Search engines Sublist3r names when asking its request gate, and the seconds the slower
+# ones need between requests (their own per-enumeration delays); the rest use --engine-interval
+SUBLIST3R_ENGINES = ("Google", "Yahoo", "Ask", "Bing", "Baidu", "Netcraft", "DNSdumpster", "Virustotal",
+                     "ThreatCrowd", "SSL Certificates", "PassiveDNS")
+ENGINE_INTERVALS = {"Google": 5, "Baidu": 3.5, "Netcraft": 1.5}
+
+def load_sublist3r():
+    """Import the bundled Sublist3r module, or return None if it is missing."""
+    if not os.path.exists(os.path.join(SUBLIST3R_DIR, 'sublist3r.py')):
+        return None
+    # sublist3r.py imports subbrute as a top-level package relative to its own folder
+    if SUBLIST3R_DIR not in sys.path:
+        sys.path.insert(0, SUBLIST3R_DIR)
+    import sublist3r
+    # Engine and subbrute lookup processes each profile themselves into their own files
+    hook = functools.partial(profile_process, PROFILER.directory, PROFILER.label) if PROFILER is not None else None
+    sublist3r.profile_hook = sublist3r.subbrute.profile_hook = hook
+    return sublist3r
+
+class EngineGate:
+    """Paces every search engine across all the enumerations of a multi-domain batch.
+
+    Each engine gets at most one request per interval, however many domains are being
+    enumerated. Engines run in their own processes, so the next free slot of each engine lives in
+    shared memory behind one lock, created from the multiprocessing `context` that starts the engines.
+    """
+
+    def __init__(self, interval=1.0, intervals=None, context=None):
+        context = context or multiprocessing.get_context()
+        self.interval = interval
+        self.intervals = dict(ENGINE_INTERVALS if intervals is None else intervals)
+        self.lock = context.Lock()
+        self.slots = {name: context.Value('d', 0.0, lock=False) for name in SUBLIST3R_ENGINES}
+
+    def __call__(self, engine):
+        slot = self.slots.get(engine)
+        if slot is None:
+            return
+        with self.lock:
+            now = time.time()
+            start = max(now, slot.value)
+            slot.value = start + max(self.intervals.get(engine, 0), self.interval)
+        if start > now:
+            time.sleep(start - now)
+
+def iter_sublist3r(domains, concurrency=1, engine_interval=None):
+    """Yield unique subdomains from in-process Sublist3r runs as soon as their engines find them.
+
+    `domains` is one domain or a list of them, enumerated at most `concurrency` at a time. With
+    several domains running together, `engine_interval` paces each search engine across all of
+    them (see EngineGate).
+    """
+    sublist3r = load_sublist3r()
+    if sublist3r is None:
         print("Error: Sublist3r script not found in the Sublist3r folder.")
-        return []
+        return
 
-    try:
+    domains = [domains] if isinstance(domains, str) else list(domains)
+    concurrency = max(1, min(concurrency, len(domains)))
+    batch = len(domains) > 1
+    sublist3r.request_gate = EngineGate(engine_interval, context=sublist3r.mp_context) if concurrency > 1 and engine_interval is not None else None
+
+    found = queue.Queue()
+    pending = queue.Queue()
+    for domain in domains:
+        pending.put(domain)
+    finished = object()
+
+    def enumerate_subdomains():
+        while True:
+            try:
+                domain = pending.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                with profiled("enumeration"):
+                    count = len(sublist3r.main(domain, 30, None, None, silent=True, verbose=False,
+                                               enable_bruteforce=False, engines=None, callback=found.put))
+                if batch:
+                    print_status(f"Sublist3r found {count} unique subdomains for {domain}.")
+            except Exception as e:
+                print_status(f"Error running Sublist3r for {domain}: {e}", message_type="error")
+        found.put(finished)
+
+    if batch:
+        print_status(f"Starting Sublist3r for {len(domains)} domains, {concurrency} at a time...")
+    else:
         print_status("Starting Sublist3r...")
-        process = subprocess.Popen(
-            ['python', sublist3r_path, '-d', domain],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
-        )
-        subdomains = set()
-
-        with tqdm(desc="Finding subdomains", unit="subdomain", leave=True) as pbar:
-            for line in process.stdout:
-                line = line.strip()
-                if line and "://" not in line:  # Ignore noise
-                    subdomain = line.split()[-1] if line.startswith("[+]") else line
-                    if subdomain and subdomain not in subdomains:
-                        subdomains.add(subdomain)
-                        pbar.update(1)
-
-        process.wait()
-
-        if process.returncode != 0:
-            print(f"Sublist3r error: {process.stderr.read().strip()}")
-            return []
+    for _ in range(concurrency):
+        threading.Thread(target=enumerate_subdomains, daemon=True).start()
 
-        print_status(f"Sublist3r found {len(subdomains)} unique subdomains.")
-        return list(subdomains)
-    except Exception as e:
-        print(f"Error running Sublist3r: {e}")
-        return []
+    count = 0
+    running = concurrency
+    while running:
+        subdomain = found.get()
+        if subdomain is finished:
+            running -= 1
+            continue
+        count += 1
+        yield subdomain
+
+    print_status(f"Sublist3r found {count} unique subdomains{f' across {len(domains)} domains' if batch else ''}.")
+
+def run_sublist3r(domain):
+    """Run Sublist3r to enumerate subdomains with a dynamic progress bar."""
+    subdomains = []
+    with tqdm.tqdm(desc="Finding subdomains", unit="subdomain", leave=True) as pbar:
+        for subdomain in iter_sublist3r(domain):
+            subdomains.append(subdomain)
+            pbar.update(1)
+    return subdomains
+
+def iter_subdomains(path):
+    """Lazily yield subdomains from a text file, a gzipped text file or stdin ("-")."""
+    if path == "-":
+        for line in sys.stdin:
+            line = line.strip()
+            if line:
+                yield line
+        return
+
+    if path.endswith(".gz"):
+        file = gzip.open(path, 'rt', encoding='utf-8', errors='replace')
+    else:
+        file = open(path, 'r', encoding='utf-8', errors='replace')
+
+    with file:
+        for line in file:
+            line = line.strip()
+            if line:
+                yield line
+
+SUBDOMAIN_PATTERN = re.compile(r'^(?!-)[A-Za-z0-9-]{1,63}(?<!-)\.(?!-)[A-Za-z0-9.-]{1,255}$')
+
+# The same rule applied to a lowercased batch of names, one per line
+CANONICAL_SUBDOMAIN_PATTERN = re.compile(r'^(?!-)[a-z0-9-]{1,63}(?<!-)\.(?!-)[a-z0-9.-]{1,255}$', re.MULTILINE)
+
+# Trailing dots of every name in a newline-joined batch
+TRAILING_DOTS_PATTERN = re.compile(r'\.+\n')
+
+# Input entries validated with one regex pass by the normalization stage
+NORMALIZE_BATCH = 4096
 
 def is_valid_subdomain(subdomain):
     """Validate subdomain using a regular expression."""
-    subdomain_regex = r'^(?!-)[A-Za-z0-9-]{1,63}(?<!-)\.(?!-)[A-Za-z0-9.-]{1,255}$'
-    return re.match(subdomain_regex, subdomain) is not None
+    return SUBDOMAIN_PATTERN.match(subdomain) is not None
+
+def canonical_batch(batch):
+    """Return the valid names of `batch` in canonical form: IDNA-encoded, lowercase and without a trailing dot.
+
+    The batch is lowercased and validated as one newline-joined string, so the per-name cost
+    stays in C; only internationalized names are encoded one by one.
+    """
+    text = "\n".join(batch)
+    if text.count("\n") != len(batch) - 1:
+        # An entry with an embedded line break would otherwise be read as several names
+        for index, name in enumerate(batch):
+            if "\n" in name:
+                batch[index] = "-"
+        text = "\n".join(batch)
+    if not text.isascii():
+        for index, name in enumerate(batch):
+            if not name.isascii():
+                try:
+                    batch[index] = idna.encode(name.rstrip("."), uts46=True).decode()
+                except (idna.IDNAError, UnicodeError):
+                    # Cannot match the pattern, so the name is counted as invalid
+                    batch[index] = "-"
+        text = "\n".join(batch)
+    return CANONICAL_SUBDOMAIN_PATTERN.findall(TRAILING_DOTS_PATTERN.sub("\n", text.lower() + "\n"))
+
+class BloomFilter:
+    """Fixed-size set of hostnames that may report a few unseen names as seen, at `error_rate`.
+
+    Sized for `capacity` names; it uses about 1.2 bytes per name at a 1% error rate, and 1.8
+    at 0.1%. Positions come from a keyless blake2b digest, so a resumed run sees the same
+    duplicates. Like a set, its length only grows when add() meets a new name.
+    """
+
+    def __init__(self, capacity, error_rate):
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def add(self, name):
+        digest = hashlib.blake2b(name.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+        new = False
+        for index in range(self.hashes):
+            position = (first + index * second) % self.size
+            mask = 1 << (position & 7)
+            if not self.bits[position >> 3] & mask:
+                self.bits[position >> 3] |= mask
+                new = True
+        self.count += new
+
+def normalize_subdomains(subdomains, bloom_capacity=None, bloom_error=0.001, batch_size=NORMALIZE_BATCH):
+    """Yield each valid subdomain of `subdomains` once, in canonical form and input order.
+
+    Entries are validated `batch_size` at a time; streaming sources pass 1 so no name waits
+    for later ones. Duplicates are found with an exact set, or with a BloomFilter when `bloom_capacity` is
+    given so memory stays bounded; a false positive then skips a host that was never seen.
+    """
+    seen = BloomFilter(bloom_capacity, bloom_error) if bloom_capacity else set()
+    entries = invalid = duplicates = 0
+    batch = []
+    for subdomain in itertools.chain(subdomains, [None]):
+        if subdomain is not None:
+            batch.append(subdomain)
+            if len(batch) < batch_size:
+                continue
+        if not batch:
+            break
+        entries += len(batch)
+        names = canonical_batch(batch)
+        invalid += len(batch) - len(names)
+        batch = []
+        for name in names:
+            before = len(seen)
+            seen.add(name)
+            if len(seen) == before:
+                duplicates += 1
+            else:
+                yield name
+
+    if invalid or duplicates:
+        print_status(f"Normalized {entries} input entries: {invalid} invalid and {duplicates} duplicate(s) skipped.")
+    if bloom_capacity and len(seen) > bloom_capacity:
+        print_status(f"{len(seen)} unique hosts overflowed the Bloom filter sized for {bloom_capacity}; "
+                     f"more hosts than the --bloom-error rate suggests may have been skipped.", message_type="warning")
+
+CSV_FIELDNAMES = ["Subdomain", "Status Code", "Accessible"]
+
+# Each pipeline queue holds at most this many items per consuming worker
+STAGE_QUEUE_FACTOR = 2
+
+# Seconds between checkpoint writes during a scan
+CHECKPOINT_INTERVAL = 10
+
+# Most hosts the rate-limit scheduler holds back before it stops pulling new ones
+RATE_LIMIT_LOOKAHEAD = 10000
+
+# Second-level labels that sit under country-code TLDs as public suffixes (co.uk, com.au, ...)
+COUNTRY_SECOND_LEVEL_LABELS = {"ac", "co", "com", "edu", "gov", "net", "org", "ne", "or", "go"}
+
+# Hosts handed to a distributed worker per lease, and seconds a lease survives without any news
+LEASE_SIZE = 500
+LEASE_TIMEOUT = 120
+
+# Probe options a coordinator imposes on its workers so every row has the same columns
+LEASED_SETTINGS = ("probe_mode", "max_redirects", "connect_timeout", "read_timeout", "cluster", "fingerprint_kb", "root_domains")
+
+# Upper bounds (seconds) of the latency histogram buckets, Prometheus style
+METRIC_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# Output formats by file extension, and the compression suffixes JSONL and Arrow outputs may add
+OUTPUT_EXTENSIONS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl", ".arrow": "arrow", ".arrows": "arrow", ".parquet": "parquet"}
+COMPRESSION_EXTENSIONS = {".gz": "gzip", ".zst": "zstd"}
+
+# Rows buffered per Arrow record batch and Parquet row group
+ROW_GROUP_SIZE = 10000
+
+# Seconds between rewrites of the Prometheus text file during a run
+METRICS_INTERVAL = 5
+
+# Seconds between --profile stack samples and allocation sites listed per stage
+PROFILE_SAMPLE_INTERVAL = 0.01
+PROFILE_TOP_ALLOCATIONS = 25
+
+# Frames tracemalloc keeps per allocation; deeper tracebacks slow every allocation several-fold
+PROFILE_TRACEBACK_DEPTH = 1
 
-def check_subdomain(subdomain):
-    """Check the accessibility of a single subdomain."""
-    if not is_valid_subdomain(subdomain):
+# Columns filled in by the DNS resolve stage
+DNS_FIELDNAMES = ["A", "AAAA", "CNAME"]
+
+# Seconds a single DNS lookup may take, retries included
+DNS_LIFETIME = 5
+
+# Seconds to cache an NXDOMAIN whose response carries no SOA record
+DNS_NEGATIVE_TTL = 300
+
+# Rows written to the result store between commits
+RESULT_STORE_COMMIT_EVERY = 500
+
+# Seconds a proxied browser connection may sit idle before it is closed
+PROXY_IDLE_TIMEOUT = 30
+
+# URL patterns blocked by the fast render profile (images are disabled through a Chrome pref)
+FAST_BLOCKED_URLS = [
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.ogg", "*.mp3", "*.wav", "*.m4a", "*.avi", "*.mov",
+    "*.gif", "*.svg", "*.ico",
+]
+
+if platform.system() == "Windows":
+    HOSTS_FILE = os.path.join(os.environ.get("SystemRoot", r"C:\Windows"), "System32", "drivers", "etc", "hosts")
+else:
+    HOSTS_FILE = "/etc/hosts"
+
+class ProbeSettings:
+    """Options shared by every accessibility probe in a run."""
+
+    def __init__(self, mode="full", max_redirects=5, connect_timeout=5, read_timeout=10, fingerprint=False, fingerprint_bytes=8192,
+                 root_domains=None):
+        # "full" mirrors a browser-like GET; "headers" stops as soon as the response headers arrive
+        self.mode = mode
+        self.max_redirects = max_redirects
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        # Fingerprint the first `fingerprint_bytes` of each response for clustering and wildcard detection
+        self.fingerprint = fingerprint
+        self.fingerprint_bytes = fingerprint_bytes
+        # Multi-domain batches tag every row with the enumerated domain it belongs to
+        self.root_domains = set(root_domains) if root_domains else None
+
+    def header_deadline(self):
+        """Return the seconds a headers-mode probe may take in all, every redirect hop included."""
+        return self.connect_timeout + self.read_timeout
+
+    def fieldnames(self):
+        """Return the CSV columns produced by probes run with these settings."""
+        fieldnames = list(CSV_FIELDNAMES)
+        if self.mode == "headers":
+            fieldnames.append("Final URL")
+        if self.fingerprint:
+            fieldnames += ["Cluster", "Wildcard"]
+        if self.root_domains:
+            fieldnames.append("Root Domain")
+        return fieldnames
+
+def root_domain(subdomain, roots):
+    """Return the longest of `roots` that `subdomain` equals or lies under, or "" if none does."""
+    labels = subdomain.lower().rstrip(".").split(".")
+    for start in range(len(labels)):
+        suffix = ".".join(labels[start:])
+        if suffix in roots:
+            return suffix
+    return ""
+
+# Response headers that go into a content fingerprint alongside the body prefix
+FINGERPRINT_HEADERS = ("Server", "Content-Type", "Location")
+
+def content_fingerprint(subdomain, status_code, headers, body_prefix):
+    """Return a short cluster id for a response, ignoring echoes of the requested hostname."""
+    host = subdomain.lower().encode()
+    digest = hashlib.sha1(str(status_code).encode())
+    for name in FINGERPRINT_HEADERS:
+        value = headers.get(name, "").lower().encode()
+        digest.update(name.encode() + b":" + value.replace(host, b"{host}") + b"\n")
+    digest.update(body_prefix.lower().replace(host, b"{host}"))
+    return digest.hexdigest()[:12]
+
+def random_sibling(subdomain):
+    """Return (parent, random nonexistent label under it) for `subdomain`, or None when there is no
+    parent a wildcard could be configured on: an IP literal, or a name directly under a TLD."""
+    try:
+        ipaddress.ip_address(subdomain)
+        return None
+    except ValueError:
+        pass
+    parent = subdomain.partition(".")[2]
+    if "." not in parent:
+        return None
+    return parent, f"{uuid.uuid4().hex[:16]}.{parent}"
+
+# Baseline fingerprints per parent domain for the thread engine, each probed exactly once
+_wildcard_baselines = {}
+_wildcard_lock = threading.Lock()
+
+def wildcard_baseline(subdomain, settings):
+    """Return the fingerprint a parent domain serves for a random nonexistent sibling of `subdomain`.
+
+    Returns "" when `subdomain` has no such parent. The baseline probe is not part of the scan, so
+    its errors and timeouts stay out of the metrics.
+    """
+    sibling = random_sibling(subdomain)
+    if sibling is None:
+        return ""
+    parent, sibling = sibling
+    with _wildcard_lock:
+        baseline = _wildcard_baselines.get(parent)
+        owner = baseline is None
+        if owner:
+            baseline = _wildcard_baselines[parent] = futures.Future()
+
+    if owner:
+        try:
+            with METRICS.unrecorded():
+                baseline.set_result(probe_subdomain(sibling, settings).get("Cluster", ""))
+        except Exception:
+            baseline.set_result("")
+    return baseline.result()
+
+def load_hosts_file(path=HOSTS_FILE):
+    """Return {hostname: {"A": [...], "AAAA": [...]}} for entries in the local hosts file.
+
+    dnspython only talks to nameservers, so hosts-file names are answered from here instead.
+    """
+    hosts = {}
+    try:
+        with open(path, 'r', encoding='utf-8', errors='replace') as file:
+            for line in file:
+                fields = line.split("#", 1)[0].split()
+                if len(fields) < 2:
+                    continue
+                rdtype = "AAAA" if ":" in fields[0] else "A"
+                for name in fields[1:]:
+                    entry = hosts.setdefault(name.lower(), {"A": [], "AAAA": []})
+                    entry[rdtype].append(fields[0])
+    except OSError:
+        pass
+    return hosts
+
+class LatencyHistogram:
+    """Cumulative-bucket latency histogram with approximate quantiles."""
+
+    def __init__(self, bounds=METRIC_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        index = 0
+        while index < len(self.bounds) and seconds > self.bounds[index]:
+            index += 1
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q):
+        """Estimate the q-quantile by interpolating inside the bucket that holds it."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = self.bounds[index - 1] if index else 0.0
+                upper = min(self.bounds[index], self.max) if index < len(self.bounds) else self.max
+                return min(lower + (upper - lower) * (rank - seen) / bucket_count, self.max)
+            seen += bucket_count
+        return self.max
+
+class ScanMetrics:
+    """Thread-safe counters, per-phase latency histograms and in-flight gauges for a run.
+
+    Phases are "dns", "connect", "tls", "first_byte", "probe", "browser_start" and "screenshot";
+    errors are counted per stage and exception class. summary() gives the JSON view and
+    prometheus_text() the text exposition format. Nothing is recorded inside unrecorded().
+    """
+
+    # Per thread and per asyncio task, so muting one probe leaves the others counted
+    muted = contextvars.ContextVar("metrics_muted", default=False)
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.started = time.monotonic()
+            self.counters = {}
+            self.errors = {}
+            self.in_flight = {}
+            self.histograms = {}
+
+    @contextlib.contextmanager
+    def unrecorded(self):
+        """Leave out everything the current thread or task records inside the block."""
+        token = self.muted.set(True)
+        try:
+            yield
+        finally:
+            self.muted.reset(token)
+
+    def observe(self, phase, seconds):
+        if self.muted.get():
+            return
+        with self.lock:
+            histogram = self.histograms.get(phase)
+            if histogram is None:
+                histogram = self.histograms[phase] = LatencyHistogram()
+            histogram.observe(seconds)
+
+    def count(self, name, amount=1):
+        if self.muted.get():
+            return
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def error(self, stage, exception):
+        if self.muted.get():
+            return
+        key = (stage, type(exception).__name__)
+        with self.lock:
+            self.errors[key] = self.errors.get(key, 0) + 1
+
+    @contextlib.contextmanager
+    def track(self, stage):
+        """Count the wrapped block as in flight for `stage` and record its duration as that phase."""
+        if self.muted.get():
+            yield
+            return
+        with self.lock:
+            self.in_flight[stage] = self.in_flight.get(stage, 0) + 1
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.monotonic() - started)
+            with self.lock:
+                self.in_flight[stage] -= 1
+
+    def summary(self):
+        with self.lock:
+            elapsed = time.monotonic() - self.started
+            return {
+                "elapsed_seconds": round(elapsed, 3),
+                "probes_per_second": round(self.counters.get("probes", 0) / elapsed, 2) if elapsed else 0.0,
+                "counters": dict(self.counters),
+                "errors": {f"{stage}:{name}": count for (stage, name), count in self.errors.items()},
+                "in_flight": dict(self.in_flight),
+                "phases": {phase: {"count": histogram.count,
+                                   "mean": round(histogram.sum / histogram.count, 4) if histogram.count else 0.0,
+                                   "p50": round(histogram.quantile(0.5), 4),
+                                   "p95": round(histogram.quantile(0.95), 4),
+                                   "p99": round(histogram.quantile(0.99), 4),
+                                   "max": round(histogram.max, 4)}
+                           for phase, histogram in self.histograms.items()},
+            }
+
+    def headline(self):
+        """One line for the end of a run: throughput, probe latency and failures."""
+        summary = self.summary()
+        probe = summary["phases"].get("probe", {})
+        probe_errors = sum(count for key, count in summary["errors"].items() if key.startswith("probe:"))
+        return (f"Probed {summary['counters'].get('probes', 0)} hosts at {summary['probes_per_second']}/s "
+                f"(p50 {probe.get('p50', 0) * 1000:.0f} ms, p99 {probe.get('p99', 0) * 1000:.0f} ms); "
+                f"{summary['counters'].get('timeouts', 0)} timeouts, {probe_errors} probe errors")
+
+    def prometheus_text(self):
+        """Render the metrics in the Prometheus text exposition format."""
+        with self.lock:
+            lines = ["# TYPE finder_events_total counter"]
+            lines += [f'finder_events_total{{event="{name}"}} {value}' for name, value in sorted(self.counters.items())]
+            lines.append("# TYPE finder_errors_total counter")
+            lines += [f'finder_errors_total{{stage="{stage}",type="{name}"}} {value}' for (stage, name), value in sorted(self.errors.items())]
+            lines.append("# TYPE finder_in_flight gauge")
+            lines += [f'finder_in_flight{{stage="{stage}"}} {value}' for stage, value in sorted(self.in_flight.items())]
+            lines.append("# TYPE finder_phase_seconds histogram")
+            for phase, histogram in sorted(self.histograms.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(histogram.bounds + ("+Inf",), histogram.counts):
+                    cumulative += bucket_count
+                    lines.append(f'finder_phase_seconds_bucket{{phase="{phase}",le="{bound}"}} {cumulative}')
+                lines.append(f'finder_phase_seconds_sum{{phase="{phase}"}} {histogram.sum:.6f}')
+                lines.append(f'finder_phase_seconds_count{{phase="{phase}"}} {histogram.count}')
+        return "\n".join(lines) + "\n"
+
+    def write(self, path, text):
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, 'w', encoding='utf-8') as file:
+            file.write(text)
+        os.replace(temporary_path, path)
+
+    def write_json(self, path):
+        self.write(path, json.dumps(self.summary(), indent=2) + "\n")
+
+    def write_prometheus(self, path):
+        self.write(path, self.prometheus_text())
+
+# Process-wide metrics; every stage reports into it
+METRICS = ScanMetrics()
+
+class StageProfiler:
+    """CPU and memory profiles for each pipeline stage, written to one directory by finish().
+
+    Every thread inside stage(name) runs under its own cProfile profiler and the stats are merged
+    per stage. A sampler thread records the wall-clock stacks of those threads as collapsed stacks
+    (for flamegraph.pl or speedscope), and a tracemalloc snapshot of the process is taken when the
+    last thread leaves a stage. Files are named after the stage, suffixed with `label` if given.
+    """
+
+    def __init__(self, directory, label=None):
+        self.directory = directory
+        self.label = label
+        os.makedirs(directory, exist_ok=True)
+        self.lock = threading.Lock()
+        self.stats = {}
+        self.stacks = {}
+        self.snapshots = {}
+        self.thread_stages = {}
+        self.running = {}
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(PROFILE_TRACEBACK_DEPTH)
+        self.stopped = threading.Event()
+        self.sampler = threading.Thread(target=self._sample, daemon=True)
+        self.sampler.start()
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Profile the calling thread as part of stage `name` for the duration of the block."""
+        ident = threading.get_ident()
+        if ident in self.thread_stages:
+            # Already profiled by an enclosing stage
+            yield
+            return
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Python 3.12+ allows one active profiler per process; the sampler still covers this thread
+            profiler = None
+        with self.lock:
+            self.thread_stages[ident] = name
+            self.running[name] = self.running.get(name, 0) + 1
+        try:
+            yield
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            with self.lock:
+                del self.thread_stages[ident]
+                self.running[name] -= 1
+                last = self.running[name] == 0
+                if profiler is not None:
+                    if name in self.stats:
+                        self.stats[name].add(profiler)
+                    else:
+                        self.stats[name] = pstats.Stats(profiler)
+            if last:
+                self.snapshots[name] = tracemalloc.take_snapshot()
+
+    def _sample(self):
+        while not self.stopped.wait(PROFILE_SAMPLE_INTERVAL):
+            frames = sys._current_frames()
+            with self.lock:
+                for ident, name in self.thread_stages.items():
+                    frame = frames.get(ident)
+                    stack = []
+                    while frame is not None:
+                        code = frame.f_code
+                        stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                        frame = frame.f_back
+                    if stack:
+                        counts = self.stacks.setdefault(name, {})
+                        key = ";".join(reversed(stack))
+                        counts[key] = counts.get(key, 0) + 1
+
+    def path(self, name, extension):
+        return os.path.join(self.directory, "-".join(filter(None, [name, self.label])) + extension)
+
+    def finish(self):
+        """Stop sampling and write <stage>.pstats, .collapsed, .tracemalloc and a .memory.txt top list per stage."""
+        if self.stopped.is_set():
+            return
+        self.stopped.set()
+        self.sampler.join()
+        with self.lock:
+            for name, stats in self.stats.items():
+                stats.dump_stats(self.path(name, ".pstats"))
+            for name, counts in self.stacks.items():
+                with open(self.path(name, ".collapsed"), 'w', encoding='utf-8') as file:
+                    for stack, samples in sorted(counts.items()):
+                        file.write(f"{stack} {samples}\n")
+            for name, snapshot in self.snapshots.items():
+                snapshot.dump(self.path(name, ".tracemalloc"))
+                with open(self.path(name, ".memory.txt"), 'w', encoding='utf-8') as file:
+                    for statistic in snapshot.statistics("lineno")[:PROFILE_TOP_ALLOCATIONS]:
+                        file.write(f"{statistic}\n")
+
+# Set by --profile; stages run under profiled() so they cost nothing when it is off
+PROFILER = None
+
+def profiled(stage):
+    """Context manager that profiles the calling thread as `stage` when --profile is on."""
+    return PROFILER.stage(stage) if PROFILER is not None else contextlib.nullcontext()
+
+@contextlib.contextmanager
+def profile_process(directory, label, name):
+    """Profile the body of a child process (a Sublist3r engine or subbrute lookup) into files of its own.
+
+    A module-level function, so the hook stays picklable for engines started with spawn or forkserver.
+    """
+    child = StageProfiler(directory, "-".join(filter(None, [label, str(os.getpid())])))
+    try:
+        with child.stage(name):
+            yield
+    finally:
+        child.finish()
+
+def finish_profile():
+    """Write the --profile output of this process, if profiling is on."""
+    if PROFILER is not None:
+        PROFILER.finish()
+
+class DNSCache:
+    """Thread-safe, TTL-respecting cache of DNS records shared by every stage of a run.
+
+    Entries map a hostname to its records (as produced by resolve_records_async) or to None
+    for NXDOMAIN, together with an absolute expiry time. With `path` set, unexpired entries
+    are loaded from and saved to a JSON file so later runs can reuse them.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.entries = {}
+        self.lock = threading.Lock()
+        if path:
+            self.load()
+
+    def get(self, name):
+        """Return (True, records) for a fresh entry (records is None for NXDOMAIN), else (False, None)."""
+        name = name.lower()
+        with self.lock:
+            entry = self.entries.get(name)
+            if entry is None:
+                return False, None
+            if entry[0] <= time.time():
+                del self.entries[name]
+                return False, None
+            return True, entry[1]
+
+    def put(self, name, records, expires):
+        with self.lock:
+            self.entries[name.lower()] = (expires, records)
+
+    def addresses(self, name):
+        """Return every cached IP address for `name`, IPv4 first; empty when nothing is cached."""
+        found, records = self.get(name)
+        if not found or not records:
+            return []
+        return records["A"].split() + records["AAAA"].split()
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as file:
+                stored = json.load(file)
+        except (OSError, ValueError):
+            return
+        now = time.time()
+        with self.lock:
+            for name, (expires, records) in stored.items():
+                if expires > now and name not in self.entries:
+                    self.entries[name] = (expires, records)
+
+    def save(self):
+        """Write unexpired entries to disk, dropping everything that has expired.
+
+        Entries already in the file are kept unless this cache has a newer answer, so shard
+        processes sharing one file do not overwrite each other's lookups.
+        """
+        if not self.path:
+            return
+        self.load()
+        now = time.time()
+        with self.lock:
+            stored = {name: list(entry) for name, entry in self.entries.items() if entry[0] > now}
+        temporary_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temporary_path, 'w', encoding='utf-8') as file:
+            json.dump(stored, file)
+        os.replace(temporary_path, self.path)
+
+# Process-wide cache; the HTTP clients and the screenshot proxy all read from it
+DNS_CACHE = DNSCache()
+
+def install_requests_dns_cache(cache=None):
+    """Make urllib3 (and therefore requests) connect to cached addresses.
+
+    Only the socket target changes: the Host header and TLS SNI still use the hostname.
+    """
+    original = urllib3.util.connection.create_connection
+    if getattr(original, "uses_dns_cache", False):
+        return
+
+    def create_connection(address, *args, **kwargs):
+        host, port = address
+        cached = (cache or DNS_CACHE).addresses(host)
+        if not cached:
+            return original(address, *args, **kwargs)
+        # Like a resolved name, try each address in turn; the last one's error is raised
+        for ip in cached[:-1]:
+            try:
+                return original((ip, port), *args, **kwargs)
+            except OSError:
+                pass
+        return original((cached[-1], port), *args, **kwargs)
+
+    create_connection.uses_dns_cache = True
+    urllib3.util.connection.create_connection = create_connection
+
+class ProbeDeadlines:
+    """Shuts down the sockets of thread-engine probes that outlive their overall deadline.
+
+    requests restarts its read timeout with every chunk received, so a server dripping its
+    headers, or a chain of slow redirects, could hold a probe far longer than its timeouts
+    suggest. Sockets opened on a thread inside enforce() are registered here, and one watcher
+    thread shuts them down when the deadline passes, which fails the blocked read at once.
+    """
+
+    def __init__(self):
+        self.local = threading.local()
+        # Heap of (deadline, sequence, sockets); a finished probe empties its list in place
+        self.pending = []
+        self.sequence = itertools.count()
+        self.condition = threading.Condition()
+        self.watcher = None
+
+    @contextlib.contextmanager
+    def enforce(self, deadline):
+        """Shut down every socket the current thread opens inside the block at `deadline` (monotonic)."""
+        sockets = []
+        with self.condition:
+            heapq.heappush(self.pending, (deadline, next(self.sequence), sockets))
+            # A forked shard inherits the attribute but not the thread
+            if self.watcher is None or not self.watcher.is_alive():
+                self.watcher = threading.Thread(target=self._watch, daemon=True)
+                self.watcher.start()
+            if self.pending[0][2] is sockets:
+                self.condition.notify()
+        self.local.sockets = sockets
+        try:
+            yield
+        finally:
+            self.local.sockets = None
+            with self.condition:
+                sockets.clear()
+
+    def register(self, sock):
+        sockets = getattr(self.local, "sockets", None)
+        if sockets is not None:
+            with self.condition:
+                sockets.append(sock)
+
+    def _watch(self):
+        with self.condition:
+            while True:
+                if not self.pending:
+                    self.condition.wait()
+                    continue
+                delay = self.pending[0][0] - time.monotonic()
+                if delay > 0:
+                    self.condition.wait(delay)
+                    continue
+                _, _, sockets = heapq.heappop(self.pending)
+                for sock in sockets:
+                    try:
+                        # The plain socket call, so a TLS socket's state is left to its reading thread
+                        socket.socket.shutdown(sock, socket.SHUT_RDWR)
+                    except OSError:
+                        pass
+                sockets.clear()
+
+PROBE_DEADLINES = ProbeDeadlines()
+
+def install_requests_timing():
+    """Time every urllib3 TCP connect and TLS handshake into METRICS, and put the sockets under PROBE_DEADLINES."""
+    original_connect = urllib3.util.connection.create_connection
+    if getattr(original_connect, "timed", False):
+        return
+
+    def create_connection(*args, **kwargs):
+        started = time.monotonic()
+        sock = original_connect(*args, **kwargs)
+        METRICS.observe("connect", time.monotonic() - started)
+        PROBE_DEADLINES.register(sock)
+        return sock
+
+    create_connection.timed = True
+    # Keep the DNS cache marker visible so install_requests_dns_cache stays idempotent
+    create_connection.uses_dns_cache = getattr(original_connect, "uses_dns_cache", False)
+    urllib3.util.connection.create_connection = create_connection
+
+    # urllib3 2.x wraps sockets through the name it imported into urllib3.connection
+    original_wrap = getattr(urllib3.connection, "ssl_wrap_socket", None)
+    if original_wrap is not None:
+        def ssl_wrap_socket(*args, **kwargs):
+            started = time.monotonic()
+            sock = original_wrap(*args, **kwargs)
+            METRICS.observe("tls", time.monotonic() - started)
+            # Wrapping detaches the plain socket, so the TLS one is what a deadline must shut down
+            PROBE_DEADLINES.register(sock)
+            return sock
+
+        urllib3.connection.ssl_wrap_socket = ssl_wrap_socket
+
+class CachedResolver:
+    """aiohttp resolver that answers from the shared DNS cache and falls back to the system resolver.
+
+    It implements aiohttp's AbstractResolver interface without subclassing it, so defining
+    it does not import aiohttp.
+    """
+
+    def __init__(self, cache=None):
+        self.cache = cache or DNS_CACHE
+        self.fallback = aiohttp.ThreadedResolver()
+
+    async def resolve(self, host, port=0, family=socket.AF_INET):
+        addresses = self.cache.addresses(host)
+        if not addresses:
+            return await self.fallback.resolve(host, port, family)
+        # aiohttp tries the addresses in order until one connects
+        return [{"hostname": host, "host": address, "port": port, "family": socket.AF_INET6 if ":" in address else socket.AF_INET,
+                 "proto": 0, "flags": socket.AI_NUMERICHOST} for address in addresses]
+
+    async def close(self):
+        await self.fallback.close()
+
+def negative_ttl(error):
+    """Return how long an NXDOMAIN may be cached, from the zone's SOA when the response has one."""
+    try:
+        for response in error.responses().values():
+            for rrset in response.authority:
+                if rrset.rdtype == dns.rdatatype.SOA:
+                    return min(rrset.ttl, rrset[0].minimum)
+    except Exception:
+        pass
+    return DNS_NEGATIVE_TTL
+
+async def resolve_records_async(resolver, subdomain, hosts=None, cache=None):
+    """Look up the A, AAAA and CNAME records of a subdomain.
+
+    Returns a dict of space-separated records keyed by DNS_FIELDNAMES, or None when the
+    name does not exist (NXDOMAIN). Lookup failures return empty records so the HTTP probe
+    still gets a chance with the system resolver. Answers are served from and stored in
+    `cache` for as long as their TTL allows.
+    """
+    try:
+        # IP literals need no lookup at all
+        address = ipaddress.ip_address(subdomain)
+        return {"A": str(address) if address.version == 4 else "", "AAAA": str(address) if address.version == 6 else "", "CNAME": ""}
+    except ValueError:
+        pass
+
+    if hosts and subdomain.lower() in hosts:
+        entry = hosts[subdomain.lower()]
+        return {"A": " ".join(entry["A"]), "AAAA": " ".join(entry["AAAA"]), "CNAME": ""}
+
+    if cache is not None:
+        found, records = cache.get(subdomain)
+        if found:
+            METRICS.count("dns_cache_hits")
+            return records
+
+    started = time.monotonic()
+    answers = await asyncio.gather(resolver.resolve(subdomain, "A", raise_on_no_answer=False),
+                                   resolver.resolve(subdomain, "AAAA", raise_on_no_answer=False),
+                                   return_exceptions=True)
+    METRICS.observe("dns", time.monotonic() - started)
+    for answer in answers:
+        if isinstance(answer, BaseException) and not isinstance(answer, dns.resolver.NXDOMAIN):
+            METRICS.error("dns", answer)
+    for answer in answers:
+        if isinstance(answer, dns.resolver.NXDOMAIN):
+            METRICS.count("nxdomain")
+            if cache is not None:
+                cache.put(subdomain, None, time.time() + negative_ttl(answer))
+            return None
+
+    # dict keys keep the first-seen order while dropping CNAMEs repeated in both answers
+    records = {field: {} for field in DNS_FIELDNAMES}
+    for answer in answers:
+        if isinstance(answer, BaseException):
+            continue
+        for rrset in answer.response.answer:
+            if rrset.rdtype == dns.rdatatype.CNAME:
+                for rdata in rrset:
+                    records["CNAME"][rdata.target.to_text(omit_final_dot=True)] = None
+            elif rrset.rdtype in (dns.rdatatype.A, dns.rdatatype.AAAA):
+                for rdata in rrset:
+                    records[dns.rdatatype.to_text(rrset.rdtype)][rdata.to_text()] = None
+    records = {field: " ".join(values) for field, values in records.items()}
+
+    # Only cache complete answers; a timed-out query should be retried next time
+    if cache is not None and not any(isinstance(answer, BaseException) for answer in answers):
+        cache.put(subdomain, records, min(answer.expiration for answer in answers))
+    return records
+
+async def resolve_subdomains_async(subdomain_list, concurrency, on_resolved, on_dead, cache=None, validated=False):
+    """Resolve subdomains on a single event loop with at most `concurrency` lookups in flight.
+
+    `on_resolved(subdomain, records)` gets every live (or unresolvable but not dead) name and
+    `on_dead(subdomain)` every NXDOMAIN. Invalid names are passed on untouched unless the list
+    is `validated` (already through normalize_subdomains). Both callbacks may block and run
+    off the event loop (see blocking_handoff).
+    """
+    resolver = dns.asyncresolver.Resolver()
+    resolver.lifetime = DNS_LIFETIME
+    hosts = load_hosts_file()
+    next_subdomain = async_puller(subdomain_list)
+    empty = {field: "" for field in DNS_FIELDNAMES}
+
+    with blocking_handoff() as hand_off:
+        async def worker():
+            while True:
+                subdomain = await next_subdomain()
+                if subdomain is None:
+                    return
+                if not validated and not is_valid_subdomain(subdomain):
+                    await hand_off(on_resolved, subdomain, empty)
+                    continue
+                try:
+                    records = await resolve_records_async(resolver, subdomain, hosts, cache)
+                except Exception:
+                    records = empty
+                if records is None:
+                    await hand_off(on_dead, subdomain)
+                else:
+                    await hand_off(on_resolved, subdomain, records)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+def unreachable_result(subdomain, settings, status_code="N/A"):
+    """Build the result row for a subdomain that was never probed over HTTP."""
+    result = {"Subdomain": subdomain, "Status Code": status_code, "Accessible": "No"}
+    if settings.mode == "headers":
+        result["Final URL"] = ""
+    if settings.fingerprint:
+        result["Cluster"] = ""
+        result["Wildcard"] = "No"
+    return result
+
+def check_subdomain(subdomain, settings=None, validated=False):
+    """Check the accessibility of a single subdomain; `validated` skips the check of its name."""
+    if not validated and not is_valid_subdomain(subdomain):
         return {"Subdomain": subdomain, "Status Code": "Invalid", "Accessible": "No"}
 
+    if settings is None:
+        settings = ProbeSettings()
+
+    with METRICS.track("probe"):
+        result = probe_subdomain(subdomain, settings)
+    METRICS.count("probes")
+    if settings.fingerprint:
+        matches = result["Cluster"] and result["Cluster"] == wildcard_baseline(subdomain, settings)
+        result["Wildcard"] = "Yes" if matches else "No"
+    return result
+
+def count_probe_error(error):
+    """Count a failed probe by exception class, and as a timeout when it ran out of time."""
+    METRICS.error("probe", error)
+    if isinstance(error, (requests.Timeout, asyncio.TimeoutError)):
+        METRICS.count("timeouts")
+
+def is_probe_timeout(result, elapsed, settings):
+    """Tell whether a probe failed by running into its deadline rather than being refused or answered."""
+    deadline = settings.header_deadline() if settings.mode == "headers" else 10
+    return result is None or (result["Status Code"] == "N/A" and elapsed >= deadline * 0.9)
+
+def probe_subdomain(subdomain, settings):
+    """Run a single probe in the configured mode."""
+    if settings.mode == "headers":
+        return check_subdomain_headers(subdomain, settings)
+    return check_subdomain_full(subdomain, settings)
+
+def check_subdomain_full(subdomain, settings):
+    """Probe a subdomain with a plain GET that follows redirects and downloads the page."""
+    cluster = ""
     try:
         response = requests.get(f"http://{subdomain}", timeout=10)
+        # elapsed runs from sending the request until the final response's headers were parsed
+        METRICS.observe("first_byte", response.elapsed.total_seconds())
         status_code = response.status_code
         accessible = "Yes" if status_code == 200 else "No"
-    except requests.RequestException:
+        if settings.fingerprint:
+            cluster = content_fingerprint(subdomain, status_code, response.headers, response.content[:settings.fingerprint_bytes])
+    except requests.RequestException as e:
+        count_probe_error(e)
         status_code = "N/A"
         accessible = "No"
 
-    return {"Subdomain": subdomain, "Status Code": status_code, "Accessible": accessible}
-
-def write_filtered_to_csv(results, output_file):
-    """Write only valid subdomains to a CSV file."""
-    valid_results = [result for result in results if is_valid_subdomain(result["Subdomain"])]
-    
-    with open(output_file, mode='w', newline='', encoding='utf-8') as csvfile:
-        fieldnames = ["Subdomain", "Status Code", "Accessible"]
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(valid_results)
-    
-    print_status(f"Filtered results saved to {output_file}")
+    result = {"Subdomain": subdomain, "Status Code": status_code, "Accessible": accessible}
+    if settings.fingerprint:
+        result["Cluster"] = cluster
+    return result
+
+def check_subdomain_headers(subdomain, settings):
+    """Probe a subdomain without downloading any response body, following a capped number of redirects.
+
+    With fingerprinting enabled only the first `fingerprint_bytes` of the final response are read.
+    The whole probe, every hop included, ends by settings.header_deadline().
+    """
+    url = f"http://{subdomain}"
+    status_code = "N/A"
+    final_url = ""
+    cluster = ""
+    deadline = time.monotonic() + settings.header_deadline()
+    out_of_time = f"No final response within {settings.header_deadline():g}s"
+
+    try:
+        with PROBE_DEADLINES.enforce(deadline):
+            for _ in range(settings.max_redirects + 1):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise requests.Timeout(out_of_time)
+                # stream=True returns once the headers are parsed; closing drops the connection unread
+                response = requests.get(url, stream=True, allow_redirects=False,
+                                        timeout=(min(settings.connect_timeout, remaining), min(settings.read_timeout, remaining)))
+                METRICS.observe("first_byte", response.elapsed.total_seconds())
+                try:
+                    if settings.fingerprint:
+                        body_prefix = b"" if response.is_redirect else response.raw.read(settings.fingerprint_bytes, decode_content=True)
+                    # Headers or a body prefix cut off at the deadline read as complete, so the hop does not count
+                    if time.monotonic() >= deadline:
+                        raise requests.Timeout(out_of_time)
+                    status_code = response.status_code
+                    final_url = url
+                    location = response.headers.get("Location")
+                    if settings.fingerprint:
+                        cluster = content_fingerprint(subdomain, status_code, response.headers, body_prefix)
+                finally:
+                    response.close()
+                if not response.is_redirect or not location:
+                    break
+                url = urljoin(url, location)
+    except (requests.RequestException, urllib3.exceptions.HTTPError) as e:
+        # A socket shut down at the deadline fails as a dropped connection; it ran out of time
+        if time.monotonic() >= deadline and not isinstance(e, requests.Timeout):
+            e = requests.Timeout(out_of_time)
+        # Keep the last hop that answered; a failure on the first hop leaves N/A
+        count_probe_error(e)
+
+    accessible = "Yes" if status_code == 200 else "No"
+    result = {"Subdomain": subdomain, "Status Code": status_code, "Accessible": accessible, "Final URL": final_url}
+    if settings.fingerprint:
+        result["Cluster"] = cluster
+    return result
+
+async def read_prefix_async(response, limit):
+    """Read at most `limit` bytes of an aiohttp response body."""
+    chunks = []
+    size = 0
+    while size < limit:
+        chunk = await response.content.read(limit - size)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        size += len(chunk)
+    return b"".join(chunks)
+
+async def check_subdomain_async(session, subdomain, settings=None, baselines=None, validated=False):
+    """Check the accessibility of a single subdomain using a shared aiohttp session.
+
+    `baselines` caches one wildcard baseline probe task per parent domain for the current event loop.
+    `validated` skips the check of the name.
+    """
+    if not validated and not is_valid_subdomain(subdomain):
+        return {"Subdomain": subdomain, "Status Code": "Invalid", "Accessible": "No"}
+
+    if settings is None:
+        settings = ProbeSettings()
+
+    with METRICS.track("probe"):
+        result = await probe_subdomain_async(session, subdomain, settings)
+    METRICS.count("probes")
+    if settings.fingerprint:
+        sibling = random_sibling(subdomain)
+        baseline = ""
+        if sibling is not None:
+            parent, sibling = sibling
+            baselines = {} if baselines is None else baselines
+            if parent not in baselines:
+                baselines[parent] = asyncio.ensure_future(unrecorded_probe_async(session, sibling, settings))
+            baseline = (await baselines[parent]).get("Cluster", "")
+        result["Wildcard"] = "Yes" if result["Cluster"] and result["Cluster"] == baseline else "No"
+    return result
+
+async def unrecorded_probe_async(session, subdomain, settings):
+    """Probe a wildcard baseline in its own task, leaving it out of the metrics like wildcard_baseline does."""
+    with METRICS.unrecorded():
+        return await probe_subdomain_async(session, subdomain, settings)
+
+async def probe_subdomain_async(session, subdomain, settings):
+    """Async counterpart of probe_subdomain."""
+    if settings.mode == "headers":
+        return await check_subdomain_headers_async(session, subdomain, settings)
+    return await check_subdomain_full_async(session, subdomain, settings)
+
+async def check_subdomain_full_async(session, subdomain, settings):
+    """Async counterpart of check_subdomain_full."""
+    cluster = ""
+    try:
+        async with session.get(f"http://{subdomain}") as response:
+            status_code = response.status
+            if settings.fingerprint:
+                body_prefix = await read_prefix_async(response, settings.fingerprint_bytes)
+                cluster = content_fingerprint(subdomain, status_code, response.headers, body_prefix)
+        accessible = "Yes" if status_code == 200 else "No"
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+        count_probe_error(e)
+        status_code = "N/A"
+        accessible = "No"
+
+    result = {"Subdomain": subdomain, "Status Code": status_code, "Accessible": accessible}
+    if settings.fingerprint:
+        result["Cluster"] = cluster
+    return result
+
+async def check_subdomain_headers_async(session, subdomain, settings):
+    """Async counterpart of check_subdomain_headers."""
+    url = f"http://{subdomain}"
+    status_code = "N/A"
+    final_url = ""
+    cluster = ""
+    deadline = time.monotonic() + settings.header_deadline()
+
+    try:
+        for _ in range(settings.max_redirects + 1):
+            # sock_read restarts with every chunk, so each hop also gets what is left of the probe's deadline
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise asyncio.TimeoutError(f"No final response within {settings.header_deadline():g}s")
+            timeout = aiohttp.ClientTimeout(total=remaining, sock_connect=settings.connect_timeout, sock_read=settings.read_timeout)
+            async with session.get(url, allow_redirects=False, timeout=timeout) as response:
+                status_code = response.status
+                final_url = url
+                location = response.headers.get("Location")
+                redirect = status_code in (301, 302, 303, 307, 308)
+                if settings.fingerprint:
+                    body_prefix = b"" if redirect else await read_prefix_async(response, settings.fingerprint_bytes)
+                    cluster = content_fingerprint(subdomain, status_code, response.headers, body_prefix)
+                # Leaving the block without reading releases the connection and discards the body
+                response.close()
+            if not redirect or not location:
+                break
+            url = urljoin(url, location)
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+        # Keep the last hop that answered; a failure on the first hop leaves N/A
+        count_probe_error(e)
+
+    accessible = "Yes" if status_code == 200 else "No"
+    result = {"Subdomain": subdomain, "Status Code": status_code, "Accessible": accessible, "Final URL": final_url}
+    if settings.fingerprint:
+        result["Cluster"] = cluster
+    return result
+
+@contextlib.contextmanager
+def blocking_handoff():
+    """Yield a coroutine function that runs a blocking callback on a thread of its own.
+
+    Stage callbacks put on bounded queues, write rows and queue screenshots, any of which may
+    wait. Run on the event loop, one full queue would freeze every probe in flight until its
+    deadline passed; handed off, it only holds back the coroutine awaiting it. One thread
+    keeps the callbacks in the order they were handed off.
+    """
+    loop = asyncio.get_running_loop()
+    with futures.ThreadPoolExecutor(max_workers=1) as executor:
+        async def hand_off(callback, *args):
+            return await loop.run_in_executor(executor, callback, *args)
+
+        yield hand_off
+
+def metrics_trace_config():
+    """Return an aiohttp TraceConfig that times connects (TCP and TLS) and waits for the first byte."""
+    trace_config = aiohttp.TraceConfig()
+
+    async def on_request_start(session, context, params):
+        context.started = time.monotonic()
+        context.connect_seconds = 0.0
+
+    async def on_connection_create_start(session, context, params):
+        context.connect_started = time.monotonic()
+
+    async def on_connection_create_end(session, context, params):
+        context.connect_seconds = time.monotonic() - context.connect_started
+        METRICS.observe("connect", context.connect_seconds)
+
+    async def on_request_end(session, context, params):
+        METRICS.observe("first_byte", time.monotonic() - context.started - context.connect_seconds)
+
+    trace_config.on_request_start.append(on_request_start)
+    trace_config.on_connection_create_start.append(on_connection_create_start)
+    trace_config.on_connection_create_end.append(on_connection_create_end)
+    trace_config.on_request_end.append(on_request_end)
+    return trace_config
+
+def async_puller(iterable):
+    """Return a coroutine function giving the next item of `iterable`, or None once it is exhausted.
+
+    Unsized iterables may block (e.g. a pipeline queue), so they are read off the event loop.
+    """
+    pending = iter(iterable)
+    blocking = not hasattr(iterable, "__len__")
+    loop = asyncio.get_running_loop()
+    # Iterators cannot be advanced from two threads at once
+    pull_lock = asyncio.Lock()
+
+    async def next_item():
+        if not blocking:
+            return next(pending, None)
+        async with pull_lock:
+            return await loop.run_in_executor(None, next, pending, None)
+
+    return next_item
+
+class AdaptiveConcurrency:
+    """AIMD controller for the number of probes in flight, bounded by `minimum` and `maximum`.
+
+    Every completed probe reports its latency and whether it timed out. After each window of
+    about `limit` completions the controller compares the window's timeout rate and p95 latency
+    with the best window seen so far. If either has clearly degraded, the limit is multiplied by
+    DECREASE. Otherwise it grows, doubling during the initial slow start and then by one per
+    window. Timeouts caused by our own NAT, ephemeral ports or a target's WAF then shrink the
+    limit before they turn into false `Accessible: No` rows.
+    """
+
+    DECREASE = 0.7
+    MIN_WINDOW = 20
+
+    def __init__(self, initial, minimum, maximum, latency_factor=2.0, timeout_margin=0.1):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.latency_factor = latency_factor
+        self.timeout_margin = timeout_margin
+        self.slow_start = True
+        self.in_flight = 0
+        self.latencies = []
+        self.timeouts = 0
+        self.best_p95 = None
+        self.best_timeout_rate = None
+        self.history = []
+        self.condition = threading.Condition()
+
+    def try_acquire(self):
+        """Take a slot if fewer than `limit` probes are in flight."""
+        with self.condition:
+            if self.in_flight >= int(self.limit):
+                return False
+            self.in_flight += 1
+            return True
+
+    def acquire(self):
+        with self.condition:
+            self.condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+
+    def release(self, latency, timed_out):
+        """Return a slot and record how the probe went; returns how many waiters may now start."""
+        with self.condition:
+            self.in_flight -= 1
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.latencies.append(latency)
+            if len(self.latencies) + self.timeouts >= max(self.MIN_WINDOW, int(self.limit)):
+                self._adjust()
+            free = int(self.limit) - self.in_flight
+            self.condition.notify(max(free, 0))
+            return free
+
+    def _adjust(self):
+        samples = len(self.latencies) + self.timeouts
+        timeout_rate = self.timeouts / samples
+        self.latencies.sort()
+        p95 = self.latencies[int(len(self.latencies) * 0.95)] if self.latencies else None
+        self.latencies = []
+        self.timeouts = 0
+
+        if self.best_timeout_rate is None or timeout_rate < self.best_timeout_rate:
+            self.best_timeout_rate = timeout_rate
+        if p95 is not None and (self.best_p95 is None or p95 < self.best_p95):
+            self.best_p95 = p95
+
+        congested = timeout_rate > self.best_timeout_rate + self.timeout_margin or \
+            (p95 is not None and p95 > self.best_p95 * self.latency_factor)
+        if congested:
+            if self.slow_start:
+                print_status(f"Adaptive concurrency: backing off at {int(self.limit)} "
+                             f"(timeouts {timeout_rate:.0%}, p95 {p95 or 0:.2f}s)", message_type="warning")
+            self.slow_start = False
+            self.limit = max(self.minimum, self.limit * self.DECREASE)
+        elif self.slow_start:
+            self.limit = min(self.maximum, self.limit * 2)
+        else:
+            self.limit = min(self.maximum, self.limit + 1)
+        self.history.append(int(self.limit))
+
+    def settled(self):
+        """Return the typical limit over the last windows (the run's working concurrency)."""
+        recent = sorted(self.history[-10:]) or [int(self.limit)]
+        return recent[len(recent) // 2]
+
+async def check_subdomains_async(subdomain_list, concurrency, settings=None, on_result=None, limiter=None, validated=False):
+    """Check subdomains on a single event loop with at most `concurrency` probes in flight.
+
+    Each result is handed to `on_result` as soon as its probe completes, in completion order,
+    off the event loop so a blocking callback cannot stall the probes in flight.
+    `subdomain_list` may be any iterable of subdomains or of (subdomain, extra_fields) pairs,
+    whose fields are merged into the result; it is consumed lazily, one entry per free worker.
+    With a `limiter` (AdaptiveConcurrency), its maximum sets the number of workers and its
+    current limit decides how many of them may probe at once. A `validated` list (already through
+    normalize_subdomains) skips the per-host name check.
+    """
+    if settings is None:
+        settings = ProbeSettings()
+    if limiter is not None:
+        concurrency = limiter.maximum
+    next_subdomain = async_puller(subdomain_list)
+
+    timeout = aiohttp.ClientTimeout(total=10)
+    # One pooled connector shared by every probe; its limit doubles as the concurrency cap
+    connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=0, use_dns_cache=False, resolver=CachedResolver())
+
+    baselines = {}
+    gate = asyncio.Condition()
+
+    async def limited_check(session, subdomain):
+        if limiter is None:
+            return await check_subdomain_async(session, subdomain, settings, baselines, validated)
+        async with gate:
+            await gate.wait_for(limiter.try_acquire)
+        started = time.monotonic()
+        result = None
+        try:
+            result = await check_subdomain_async(session, subdomain, settings, baselines, validated)
+            return result
+        finally:
+            elapsed = time.monotonic() - started
+            free = limiter.release(elapsed, is_probe_timeout(result, elapsed, settings))
+            async with gate:
+                gate.notify(max(free, 0))
+
+    with blocking_handoff() as hand_off:
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout, trace_configs=[metrics_trace_config()]) as session:
+            async def worker():
+                # Workers pull from a shared iterator, so only `concurrency` coroutines ever exist
+                while True:
+                    item = await next_subdomain()
+                    if item is None:
+                        return
+                    subdomain, extra_fields = item if isinstance(item, tuple) else (item, None)
+                    result = await limited_check(session, subdomain)
+                    if extra_fields:
+                        result.update(extra_fields)
+                    if on_result is not None:
+                        await hand_off(on_result, result)
+
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+# Marks the end of the input on a pipeline queue
+_STAGE_DONE = object()
+
+def iter_queue(stage_queue):
+    """Yield items from a pipeline queue until the end marker arrives."""
+    while True:
+        item = stage_queue.get()
+        if item is _STAGE_DONE:
+            return
+        yield item
+
+class PipelineStage:
+    """A fixed pool of worker threads that take items from a bounded inbox until the end marker arrives.
+
+    `handle` returns the item to pass to the outbox, or None to drop it. Putting on a full outbox
+    blocks, which pushes backpressure upstream. When the last worker finishes, one end marker per
+    downstream consumer is put on the outbox.
+
+    A `growable` stage needs a single end marker on its inbox, which every worker puts back for
+    the next, so grow() can add workers while the stage runs.
+    """
+
+    def __init__(self, name, workers, handle, inbox, outbox=None, downstream_workers=1, growable=False):
+        self.name = name
+        self.handle = handle
+        self.inbox = inbox
+        self.outbox = outbox
+        self.downstream_workers = downstream_workers
+        self.growable = growable
+        self.remaining = workers
+        self.lock = threading.Lock()
+        self.threads = [threading.Thread(target=self._worker, daemon=True) for _ in range(workers)]
+
+    def start(self):
+        for thread in self.threads:
+            thread.start()
+        return self
+
+    def grow(self, workers):
+        """Start more workers until the stage has `workers`; a stage that has finished stays finished."""
+        with self.lock:
+            added = []
+            while self.remaining and len(self.threads) < workers:
+                added.append(threading.Thread(target=self._worker, daemon=True))
+                self.threads.append(added[-1])
+                self.remaining += 1
+        for thread in added:
+            thread.start()
+
+    def join(self):
+        # Joined threads cannot grow the list; only the ones added meanwhile are left to wait for
+        joined = 0
+        while joined < len(self.threads):
+            self.threads[joined].join()
+            joined += 1
+
+    def _worker(self):
+        with profiled(self.name.lower()):
+            for item in iter_queue(self.inbox):
+                try:
+                    output = self.handle(item)
+                except Exception as e:
+                    print_status(f"{self.name} stage failed on {item}: {e}", message_type="error")
+                    continue
+                if output is not None and self.outbox is not None:
+                    self.outbox.put(output)
+        if self.growable:
+            self.inbox.put(_STAGE_DONE)
+
+        with self.lock:
+            self.remaining -= 1
+            last = self.remaining == 0
+        if last and self.outbox is not None:
+            for _ in range(self.downstream_workers):
+                self.outbox.put(_STAGE_DONE)
+
+def registrable_domain(subdomain):
+    """Return the registrable parent of `subdomain` (example.com, example.co.uk) without a suffix list."""
+    labels = subdomain.lower().rstrip(".").split(".")
+    keep = 2
+    if len(labels) >= 3 and len(labels[-1]) == 2 and labels[-2] in COUNTRY_SECOND_LEVEL_LABELS:
+        keep = 3
+    return ".".join(labels[-keep:])
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, holding at most `burst`."""
+
+    def __init__(self, rate, burst, now=None):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic() if now is None else now
+
+    def refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now):
+        """Return seconds until a token is available (0 if one is available now)."""
+        self.refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+class HostRateLimiter:
+    """Token buckets per resolved IP and per registrable parent domain.
+
+    A probe may start only when both of its buckets hold a token. Buckets that have been idle
+    long enough to refill completely are dropped, so memory follows the active targets only.
+    """
+
+    def __init__(self, ip_rate, ip_burst, domain_rate, domain_burst):
+        self.ip_rate, self.ip_burst = ip_rate, ip_burst
+        self.domain_rate, self.domain_burst = domain_rate, domain_burst
+        self.ip_buckets = {}
+        self.domain_buckets = {}
+        self.calls = 0
+
+    def reserve(self, ip, domain):
+        """Take a token from both buckets and return 0, or return the seconds to wait without taking any."""
+        now = time.monotonic()
+        self.calls += 1
+        if self.calls % RATE_LIMIT_LOOKAHEAD == 0:
+            self.prune(now)
+        ip_bucket = self.ip_buckets.get(ip)
+        if ip_bucket is None:
+            ip_bucket = self.ip_buckets[ip] = TokenBucket(self.ip_rate, self.ip_burst, now)
+        domain_bucket = self.domain_buckets.get(domain)
+        if domain_bucket is None:
+            domain_bucket = self.domain_buckets[domain] = TokenBucket(self.domain_rate, self.domain_burst, now)
+        wait = max(ip_bucket.wait_time(now), domain_bucket.wait_time(now))
+        if wait == 0:
+            ip_bucket.tokens -= 1
+            domain_bucket.tokens -= 1
+        return wait
+
+    def prune(self, now):
+        for buckets in (self.ip_buckets, self.domain_buckets):
+            for key in [key for key, bucket in buckets.items() if now - bucket.updated > bucket.burst / bucket.rate]:
+                del buckets[key]
+
+class RateLimitScheduler:
+    """Pipeline stage that releases probe items to `outbox` only when their IP and parent domain allow it.
+
+    Items that must wait are parked in a heap ordered by when they become due, and the stage keeps
+    pulling other hosts meanwhile, so the probe workers stay busy with different targets instead of
+    queueing behind one edge. At most RATE_LIMIT_LOOKAHEAD items are parked; beyond that the stage
+    stops pulling, which pushes backpressure upstream. Items are (subdomain, records) pairs.
+    """
+
+    def __init__(self, limiter, inbox, outbox, downstream_workers=1, cancelled=None):
+        self.limiter = limiter
+        self.inbox = inbox
+        self.outbox = outbox
+        self.downstream_workers = downstream_workers
+        self.cancelled = cancelled or threading.Event()
+        self.parked = []
+        self.sequence = itertools.count()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def join(self):
+        self.thread.join()
+
+    @staticmethod
+    def keys(item):
+        subdomain, records = item
+        addresses = (records.get("A") or records.get("AAAA") or "").split()
+        return (addresses[0] if addresses else subdomain), registrable_domain(subdomain)
+
+    def offer(self, item, not_before):
+        """Dispatch `item` if its buckets allow, otherwise park it until they should."""
+        wait = self.limiter.reserve(*self.keys(item))
+        if wait == 0:
+            self.outbox.put(item)
+        else:
+            heapq.heappush(self.parked, (max(not_before, time.monotonic() + wait), next(self.sequence), item))
+
+    def _run(self):
+        with profiled("rate-limit"):
+            done = False
+            while not done or self.parked:
+                if self.cancelled.is_set():
+                    # Stopping: parked hosts are dropped, the upstream queue is drained unprobed
+                    self.parked = []
+                    for _ in iter_queue(self.inbox) if not done else ():
+                        pass
+                    break
+                now = time.monotonic()
+                if self.parked and self.parked[0][0] <= now:
+                    self.offer(heapq.heappop(self.parked)[2], now)
+                    continue
+                timeout = self.parked[0][0] - now if self.parked else None
+                if done or len(self.parked) >= RATE_LIMIT_LOOKAHEAD:
+                    time.sleep(timeout)
+                    continue
+                try:
+                    item = self.inbox.get(timeout=timeout)
+                except queue.Empty:
+                    continue
+                if item is _STAGE_DONE:
+                    done = True
+                else:
+                    self.offer(item, now)
+            for _ in range(self.downstream_workers):
+                self.outbox.put(_STAGE_DONE)
+
+class ResultWriter:
+    """Base of the streaming output writers: skips rows for invalid subdomains, counts rows and closes on exit.
+
+    Subclasses implement write_row(), close() and, when they buffer, flush(). A run whose hosts
+    were validated up front clears `skip_invalid` so rows are not checked a second time.
+    """
+
+    rows_written = 0
+    skip_invalid = True
+
+    def write(self, result):
+        """Write a single result row; rows for invalid subdomains are filtered out here."""
+        if self.skip_invalid and not is_valid_subdomain(result["Subdomain"]):
+            return
+        self.write_row(result)
+        self.rows_written += 1
+
+    def flush(self):
+        """Make every row written so far durable on disk."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+def drop_partial_line(path):
+    """Truncate a text file after its last newline, dropping a row a crash cut short."""
+    with open(path, 'rb+') as file:
+        # Search backwards for the end of the last complete line
+        end = position = file.seek(0, os.SEEK_END)
+        while position > 0:
+            start = max(0, position - 65536)
+            file.seek(start)
+            newline = file.read(position - start).rfind(b"\n")
+            if newline >= 0:
+                position = start + newline + 1
+                break
+            position = start
+        if position < end:
+            file.truncate(position)
+
+class StreamingCSVWriter(ResultWriter):
+    """Append result rows to a CSV file one at a time, flushing after every row."""
+
+    def __init__(self, output_file, fieldnames=None, append=False):
+        self.output_file = output_file
+        if append and os.path.exists(output_file):
+            drop_partial_line(output_file)
+        # Appending to a non-empty file (a resumed scan) keeps its existing header
+        write_header = not (append and os.path.exists(output_file) and os.path.getsize(output_file) > 0)
+        self.csvfile = open(output_file, mode='a' if append else 'w', newline='', encoding='utf-8')
+        self.writer = csv.DictWriter(self.csvfile, fieldnames=fieldnames or CSV_FIELDNAMES)
+        if write_header:
+            self.writer.writeheader()
+        self.csvfile.flush()
+
+    def write_row(self, result):
+        # Flushed row by row so the file is readable mid-scan
+        self.writer.writerow(result)
+        self.csvfile.flush()
+
+    def close(self):
+        self.csvfile.close()
+
+def split_output_extension(path):
+    """Split an output path into its root and its format extension, compression suffix included."""
+    root, extension = os.path.splitext(path)
+    compression = extension.lower() if extension.lower() in COMPRESSION_EXTENSIONS else ""
+    if compression:
+        root, extension = os.path.splitext(root)
+    if extension.lower() not in OUTPUT_EXTENSIONS:
+        return (path[:-len(compression)], compression) if compression else os.path.splitext(path)
+    return root, extension + compression
+
+def output_format(path):
+    """Return the output format ("csv", "jsonl", "arrow" or "parquet") and compression of an output path."""
+    extension = split_output_extension(path)[1].lower()
+    for suffix, compression in COMPRESSION_EXTENSIONS.items():
+        if extension.endswith(suffix):
+            return OUTPUT_EXTENSIONS.get(extension[:-len(suffix)], "csv"), compression
+    return OUTPUT_EXTENSIONS.get(extension, "csv"), None
+
+def resolve_output_file(path, fmt=None, compression=None):
+    """Apply --output-format/--compress to an output path, or return an error message for an unusable one.
+
+    Parquet falls back to Arrow IPC when pyarrow is not installed; compression applies to JSONL and Arrow.
+    """
+    root, extension = split_output_extension(path)
+    current_format, current_compression = output_format(path)
+    fmt = fmt or current_format
+    compression = compression or current_compression
+    if fmt == "parquet" and pyarrow is None:
+        print_status("Parquet output needs pyarrow (pip install pyarrow); writing an Arrow IPC stream instead.", message_type="warning")
+        fmt = "arrow"
+    if compression and fmt in ("csv", "parquet"):
+        print_status(f"{fmt.upper()} output is not compressed as a whole; ignoring {compression} compression.", message_type="warning")
+        compression = None
+    if compression == "zstd" and zstandard is None:
+        return None, "zstd output needs the zstandard package (pip install zstandard)."
+    if (fmt, compression) == (current_format, current_compression):
+        return path, None
+    suffix = {"csv": ".csv", "jsonl": ".jsonl", "arrow": ".arrow", "parquet": ".parquet"}[fmt]
+    suffix += {"gzip": ".gz", "zstd": ".zst", None: ""}[compression]
+    return root + suffix, None
+
+class ZstdReader(io.RawIOBase):
+    """Raw reader decompressing a zstd file across frames.
+
+    zstandard's own stream_reader can report end of file early while the
+    last frame is still open, which is exactly the state a crash leaves.
+    """
+    def __init__(self, file):
+        self.file = file
+        self.decompressor = zstandard.ZstdDecompressor().decompressobj(read_across_frames=True)
+        self.pending = b""
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self.pending:
+            chunk = self.file.read(65536)
+            if not chunk:
+                return 0
+            self.pending = self.decompressor.decompress(chunk)
+        size = min(len(buffer), len(self.pending))
+        buffer[:size] = self.pending[:size]
+        self.pending = self.pending[size:]
+        return size
+
+    def close(self):
+        self.file.close()
+        super().close()
+
+def open_output(path, mode):
+    """Open an output file in binary `mode`, compressing or decompressing by its extension."""
+    compression = output_format(path)[1]
+    if compression == "gzip":
+        return gzip.open(path, mode)
+    if compression == "zstd":
+        if 'r' in mode:
+            # Buffered, so reads return whole lines and exact sizes
+            return io.BufferedReader(ZstdReader(open(path, 'rb')))
+        return zstandard.ZstdCompressor().stream_writer(open(path, mode))
+    return open(path, mode)
+
+def row_values(result, fieldnames):
+    """Return a row's values in column order as strings, the way the CSV writer renders them."""
+    return [("" if value is None else str(value)) for value in (result.get(name) for name in fieldnames)]
+
+def read_complete_lines(path):
+    """Yield the complete lines of a possibly compressed output file, stopping quietly where a crash cut it short."""
+    try:
+        with open_output(path, 'rb') as file:
+            for line in file:
+                if not line.endswith(b"\n"):
+                    return
+                yield line
+    except (EOFError, zlib.error) + ((zstandard.ZstdError,) if zstandard is not None else ()):
+        return
+
+class JSONLinesWriter(ResultWriter):
+    """Append result rows to a JSON Lines file, optionally gzip or zstd compressed.
+
+    Every value is written as a string, as in the CSV. Uncompressed files are flushed after every
+    row; compressed ones at each flush() (every checkpoint) and on close. Appending drops a line
+    cut short by a crash; a compressed file is rewritten with its complete lines, because its
+    stream may end in a partial block.
+    """
+
+    def __init__(self, output_file, fieldnames=None, append=False):
+        self.fieldnames = fieldnames or CSV_FIELDNAMES
+        self.compressed = output_format(output_file)[1] is not None
+        if not (append and os.path.exists(output_file)):
+            self.file = open_output(output_file, 'wb')
+        elif self.compressed:
+            root, extension = split_output_extension(output_file)
+            previous = f"{root}.previous{extension}"
+            os.replace(output_file, previous)
+            self.file = open_output(output_file, 'wb')
+            for line in read_complete_lines(previous):
+                self.file.write(line)
+            os.remove(previous)
+            self.file.flush()
+        else:
+            drop_partial_line(output_file)
+            self.file = open(output_file, 'ab')
+
+    def write_row(self, result):
+        self.file.write((json.dumps(dict(zip(self.fieldnames, row_values(result, self.fieldnames))), ensure_ascii=False) + "\n").encode())
+        if not self.compressed:
+            self.file.flush()
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+# Arrow IPC: metadata version V5, message header and field type union tags, and the stream markers
+ARROW_METADATA_VERSION = 4
+ARROW_SCHEMA, ARROW_RECORD_BATCH = 1, 3
+ARROW_UTF8 = 5
+ARROW_CONTINUATION = b"\xff\xff\xff\xff"
+ARROW_EOS = ARROW_CONTINUATION + b"\x00\x00\x00\x00"
+
+class FlatTable:
+    """A flatbuffer table to encode; `fields` come in field-id order and are None (absent),
+    a (struct format, value) scalar, a str, a FlatTable or a FlatVector."""
+
+    def __init__(self, *fields):
+        self.fields = fields
+
+class FlatVector:
+    """A flatbuffer vector of tables or strings, or of tuples packed as structs with `struct_format`."""
+
+    def __init__(self, items, struct_format=None):
+        self.items = items
+        self.struct_format = struct_format
+
+def encode_flatbuffer(root):
+    """Encode a FlatTable as a flatbuffer, laid out front to back so every offset points forward."""
+    buffer = bytearray(4)
+
+    def align(size, extra=0):
+        while (len(buffer) + extra) % size:
+            buffer.append(0)
+
+    def patch(at, target):
+        struct.pack_into("<I", buffer, at, target - at)
+
+    def write(item):
+        if isinstance(item, str):
+            data = item.encode()
+            align(4)
+            position = len(buffer)
+            buffer.extend(struct.pack("<I", len(data)) + data + b"\0")
+            return position
+        if isinstance(item, FlatVector):
+            if item.struct_format:
+                # The length prefix sits right before 8-byte aligned structs
+                align(8, 4)
+                position = len(buffer)
+                buffer.extend(struct.pack("<I", len(item.items)))
+                for value in item.items:
+                    buffer.extend(struct.pack(item.struct_format, *value))
+                return position
+            align(4)
+            position = len(buffer)
+            buffer.extend(struct.pack("<I", len(item.items)))
+            slots = []
+            for _ in item.items:
+                slots.append(len(buffer))
+                buffer.extend(bytes(4))
+            for slot, value in zip(slots, item.items):
+                patch(slot, write(value))
+            return position
+
+        # A table: its vtable, then the 8-byte aligned table (widest fields first), then its children
+        sizes = [0 if field is None else struct.calcsize(field[0]) if isinstance(field, tuple) else 4 for field in item.fields]
+        offsets, size = [0] * len(sizes), 4
+        for index in sorted(range(len(sizes)), key=lambda index: -sizes[index]):
+            if sizes[index]:
+                size += -size % sizes[index]
+                offsets[index] = size
+                size += sizes[index]
+        size += -size % 4
+        align(2)
+        vtable = len(buffer)
+        buffer.extend(struct.pack(f"<HH{len(offsets)}H", 4 + 2 * len(offsets), size, *offsets))
+        align(8)
+        position = len(buffer)
+        buffer.extend(struct.pack("<i", position - vtable) + bytes(size - 4))
+        children = []
+        for field, offset in zip(item.fields, offsets):
+            if isinstance(field, tuple):
+                struct.pack_into(field[0], buffer, position + offset, field[1])
+            elif field is not None:
+                children.append((position + offset, field))
+        for at, child in children:
+            patch(at, write(child))
+        return position
+
+    patch(0, write(root))
+    return bytes(buffer)
+
+def flat_table(buffer, position):
+    """Return a function mapping a field id of the flatbuffer table at `position` to its position, or None."""
+    vtable = position - struct.unpack_from("<i", buffer, position)[0]
+    vtable_size = struct.unpack_from("<H", buffer, vtable)[0]
+
+    def field(index):
+        entry = 4 + 2 * index
+        offset = struct.unpack_from("<H", buffer, vtable + entry)[0] if entry < vtable_size else 0
+        return position + offset if offset else None
+
+    return field
+
+def flat_offset(buffer, position):
+    """Follow the forward offset stored at `position`."""
+    return position + struct.unpack_from("<I", buffer, position)[0]
+
+def arrow_message(header_type, header, body=b""):
+    """Frame a Message flatbuffer and its body as one encapsulated Arrow IPC message."""
+    metadata = encode_flatbuffer(FlatTable(("<h", ARROW_METADATA_VERSION), ("<B", header_type), header, ("<q", len(body))))
+    metadata += bytes(-len(metadata) % 8)
+    return ARROW_CONTINUATION + struct.pack("<i", len(metadata)) + metadata + body
+
+def arrow_schema_message(fieldnames):
+    """Schema message for a table of UTF-8 columns, declared nullable as pyarrow does by default."""
+    fields = [FlatTable(name, ("<B", 1), ("<B", ARROW_UTF8), FlatTable(), None, FlatVector([])) for name in fieldnames]
+    return arrow_message(ARROW_SCHEMA, FlatTable(None, FlatVector(fields)))
+
+def arrow_batch_message(columns):
+    """Record batch message for equally long lists of strings, one list per column."""
+    length = len(columns[0]) if columns else 0
+    body, buffers = bytearray(), []
+    for values in columns:
+        encoded = [value.encode() for value in values]
+        offsets = array.array('i', [0])
+        for value in encoded:
+            offsets.append(offsets[-1] + len(value))
+        if sys.byteorder == "big":
+            offsets.byteswap()
+        # No validity bitmap: the columns have no nulls
+        buffers.append((len(body), 0))
+        for data in (offsets.tobytes(), b"".join(encoded)):
+            buffers.append((len(body), len(data)))
+            body += data + bytes(-len(data) % 8)
+    nodes = [(length, 0)] * len(columns)
+    return arrow_message(ARROW_RECORD_BATCH, FlatTable(("<q", length), FlatVector(nodes, "<qq"), FlatVector(buffers, "<qq")), bytes(body))
+
+def iter_arrow_messages(file):
+    """Yield (header type, header position, metadata, body, raw message) for each message of an Arrow IPC stream.
+
+    A truncated tail (a crash mid-write) ends the iteration quietly.
+    """
+    while True:
+        prefix = file.read(8)
+        if len(prefix) < 8:
+            return
+        size = struct.unpack("<i", prefix[4:])[0]
+        if prefix[:4] != ARROW_CONTINUATION or size <= 0:
+            return
+        metadata = file.read(size)
+        if len(metadata) < size:
+            return
+        message = flat_table(metadata, flat_offset(metadata, 0))
+        header_type = metadata[message(1)] if message(1) else 0
+        body_length = struct.unpack_from("<q", metadata, message(3))[0] if message(3) else 0
+        body = file.read(body_length)
+        if len(body) < body_length:
+            return
+        yield header_type, flat_offset(metadata, message(2)), metadata, body, prefix + metadata + body
+
+def arrow_schema_names(metadata, header):
+    """Column names of a schema message; only the UTF-8 columns this module writes are supported."""
+    schema = flat_table(metadata, header)
+    fields = flat_offset(metadata, schema(1))
+    names = []
+    for index in range(struct.unpack_from("<I", metadata, fields)[0]):
+        field = flat_table(metadata, flat_offset(metadata, fields + 4 + 4 * index))
+        if not field(2) or metadata[field(2)] != ARROW_UTF8:
+            raise ValueError("only Arrow streams of UTF-8 columns written by this tool can be read back")
+        name = flat_offset(metadata, field(0))
+        names.append(metadata[name + 4:name + 4 + struct.unpack_from("<I", metadata, name)[0]].decode())
+    return names
+
+def arrow_batch_columns(metadata, header, body, count):
+    """Decode the `count` UTF-8 columns of a record batch message into lists of strings."""
+    batch = flat_table(metadata, header)
+    length = struct.unpack_from("<q", metadata, batch(0))[0]
+    buffers = flat_offset(metadata, batch(2)) + 4
+    columns = []
+    for column in range(count):
+        (offsets_start, offsets_length), (data_start, data_length) = (
+            struct.unpack_from("<qq", metadata, buffers + 16 * (3 * column + index)) for index in (1, 2))
+        offsets = array.array('i')
+        offsets.frombytes(body[offsets_start:offsets_start + offsets_length])
+        if sys.byteorder == "big":
+            offsets.byteswap()
+        data = body[data_start:data_start + data_length]
+        columns.append([data[offsets[row]:offsets[row + 1]].decode() for row in range(length)])
+    return columns
+
+def read_arrow_stream(path):
+    """Yield the rows of an Arrow IPC stream written by ArrowStreamWriter as dicts."""
+    with open_output(path, 'rb') as file:
+        names = None
+        for header_type, header, metadata, body, _ in iter_arrow_messages(file):
+            if header_type == ARROW_SCHEMA:
+                names = arrow_schema_names(metadata, header)
+            elif header_type == ARROW_RECORD_BATCH and names:
+                for values in zip(*arrow_batch_columns(metadata, header, body, len(names))):
+                    yield dict(zip(names, values))
+
+def iter_arrow_batches(path, fieldnames):
+    """Yield the record batches of an Arrow IPC stream as lists of columns; a stream with other columns is refused."""
+    with open_output(path, 'rb') as file:
+        for header_type, header, metadata, body, _ in iter_arrow_messages(file):
+            if header_type == ARROW_SCHEMA:
+                names = arrow_schema_names(metadata, header)
+                if names != list(fieldnames):
+                    raise ValueError(f"{path} has columns {names}, not {list(fieldnames)}; resume with the same probe options")
+            elif header_type == ARROW_RECORD_BATCH:
+                yield arrow_batch_columns(metadata, header, body, len(fieldnames))
+
+class ArrowStreamWriter(ResultWriter):
+    """Write result rows as an Arrow IPC stream of UTF-8 columns, in pure Python, optionally gzip or zstd compressed.
+
+    Rows are buffered and written as one record batch per ROW_GROUP_SIZE rows or per flush(), so
+    an interrupted file still holds every complete batch. The output loads without parsing, e.g.
+    pyarrow.ipc.open_stream(path) (through pyarrow.input_stream(path, compression=...) when compressed)
+    or polars.read_ipc_stream(path). Appending (a resumed scan) rewrites the file: its batches are
+    copied into a fresh stream, because a finished stream cannot be extended in place.
+    """
+
+    def __init__(self, output_file, fieldnames=None, append=False):
+        self.fieldnames = fieldnames or CSV_FIELDNAMES
+        self.columns = [[] for _ in self.fieldnames]
+        previous = None
+        if append and os.path.exists(output_file):
+            root, extension = split_output_extension(output_file)
+            previous = f"{root}.previous{extension}"
+            os.replace(output_file, previous)
+        self.file = open_output(output_file, 'wb')
+        self.file.write(arrow_schema_message(self.fieldnames))
+        if previous is not None:
+            copy_arrow_batches(previous, self.file, self.fieldnames)
+            os.remove(previous)
+        self.file.flush()
+
+    def write_row(self, result):
+        for column, value in zip(self.columns, row_values(result, self.fieldnames)):
+            column.append(value)
+        if len(self.columns[0]) >= ROW_GROUP_SIZE:
+            self.write_batch()
+
+    def write_batch(self):
+        if self.columns[0]:
+            self.file.write(arrow_batch_message(self.columns))
+            self.columns = [[] for _ in self.fieldnames]
+
+    def flush(self):
+        self.write_batch()
+        self.file.flush()
+
+    def close(self):
+        self.write_batch()
+        self.file.write(ARROW_EOS)
+        self.file.close()
+
+def copy_arrow_batches(path, destination, fieldnames=None):
+    """Copy the record batches of the Arrow stream at `path` into an open `destination` stream unchanged.
+
+    Returns the stream's column names; with `fieldnames`, a stream with other columns is refused.
+    """
+    names = None
+    with open_output(path, 'rb') as file:
+        for header_type, header, metadata, _, raw in iter_arrow_messages(file):
+            if header_type == ARROW_SCHEMA:
+                names = arrow_schema_names(metadata, header)
+                if fieldnames is not None and names != list(fieldnames):
+                    raise ValueError(f"{path} has columns {names}, not {list(fieldnames)}; resume with the same probe options")
+            elif header_type == ARROW_RECORD_BATCH:
+                destination.write(raw)
+    return names
+
+class ParquetResultWriter(ArrowStreamWriter):
+    """Write result rows to Parquet (zstd compressed) through pyarrow, one row group per record batch.
+
+    Each batch the Arrow writer would emit (ROW_GROUP_SIZE rows or a flush()) becomes a row group of
+    `<output>.tmp`, which replaces the output on close. A Parquet file is only readable once its
+    footer is written, so the batches are also journalled to an Arrow stream next to the output
+    (`<output>.spool.arrow`). When appending, the rows of an existing output and of a journal left
+    by a crash are carried over first.
+    """
+
+    def __init__(self, output_file, fieldnames=None, append=False):
+        # The pyarrow package does not import its Parquet module by itself
+        import pyarrow.parquet
+        fieldnames = fieldnames or CSV_FIELDNAMES
+        self.output_file = output_file
+        self.spool_file = output_file + ".spool.arrow"
+        self.temporary_path = output_file + ".tmp"
+        self.schema = pyarrow.schema([(name, pyarrow.string()) for name in fieldnames])
+        self.parquet = pyarrow.parquet.ParquetWriter(self.temporary_path, self.schema, compression="zstd")
+        if append and os.path.exists(output_file):
+            existing = pyarrow.parquet.ParquetFile(output_file)
+            if existing.schema_arrow.names != list(fieldnames):
+                raise ValueError(f"{output_file} has columns {existing.schema_arrow.names}, not {list(fieldnames)}; "
+                                 f"resume with the same probe options")
+            for batch in existing.iter_batches(ROW_GROUP_SIZE):
+                self.parquet.write_batch(batch)
+        journalled = append and os.path.exists(self.spool_file)
+        if journalled:
+            for columns in iter_arrow_batches(self.spool_file, fieldnames):
+                self.write_row_group(columns)
+        super().__init__(self.spool_file, fieldnames, append=journalled)
+
+    def write_row_group(self, columns):
+        arrays = [pyarrow.array(values, pyarrow.string()) for values in columns]
+        self.parquet.write_batch(pyarrow.RecordBatch.from_arrays(arrays, schema=self.schema))
+
+    def write_batch(self):
+        if self.columns[0]:
+            self.write_row_group(self.columns)
+        super().write_batch()
+
+    def close(self):
+        super().close()
+        self.parquet.close()
+        os.replace(self.temporary_path, self.output_file)
+        os.remove(self.spool_file)
+
+def open_result_writer(output_file, fieldnames=None, append=False):
+    """Open the streaming writer for the format named by `output_file`'s extension (CSV by default)."""
+    writer = {"csv": StreamingCSVWriter, "jsonl": JSONLinesWriter, "arrow": ArrowStreamWriter,
+              "parquet": ParquetResultWriter}[output_format(output_file)[0]]
+    return writer(output_file, fieldnames, append)
+
+def read_results(output_file):
+    """Yield the rows of an output file in any supported format as dicts of strings."""
+    fmt = output_format(output_file)[0]
+    if fmt == "csv":
+        with open(output_file, 'r', newline='', encoding='utf-8') as file:
+            yield from csv.DictReader(file)
+    elif fmt == "jsonl":
+        for line in read_complete_lines(output_file):
+            yield json.loads(line)
+    elif fmt == "arrow":
+        yield from read_arrow_stream(output_file)
+    else:
+        if os.path.exists(output_file):
+            import pyarrow.parquet
+            for batch in pyarrow.parquet.ParquetFile(output_file).iter_batches(ROW_GROUP_SIZE):
+                yield from batch.to_pylist()
+        if os.path.exists(output_file + ".spool.arrow"):
+            yield from read_arrow_stream(output_file + ".spool.arrow")
+
+def merge_result_files(parts, output_file):
+    """Merge shard outputs of the same format into `output_file`, removing the parts."""
+    fmt = output_format(output_file)[0]
+    if fmt == "csv":
+        # Concatenate the parts under a single header
+        with open(output_file, 'w', newline='', encoding='utf-8') as merged:
+            for index, part in enumerate(parts):
+                with open(part, 'r', newline='', encoding='utf-8') as file:
+                    header = file.readline()
+                    if index == 0:
+                        merged.write(header)
+                    shutil.copyfileobj(file, merged)
+    elif fmt == "jsonl":
+        # Lines, gzip members and zstd frames all concatenate as they are
+        with open(output_file, 'wb') as merged:
+            for part in parts:
+                with open(part, 'rb') as file:
+                    shutil.copyfileobj(file, merged)
+    elif fmt == "arrow":
+        with open_output(output_file, 'wb') as merged:
+            for index, part in enumerate(parts):
+                if index == 0:
+                    with open_output(part, 'rb') as file:
+                        merged.write(next(iter_arrow_messages(file))[4])
+                copy_arrow_batches(part, merged)
+            merged.write(ARROW_EOS)
+    else:
+        import pyarrow.parquet
+        schema = pyarrow.parquet.read_schema(parts[0])
+        with pyarrow.parquet.ParquetWriter(output_file, schema, compression="zstd") as merged:
+            for part in parts:
+                for batch in pyarrow.parquet.ParquetFile(part).iter_batches(ROW_GROUP_SIZE):
+                    merged.write_batch(batch)
+    for part in parts:
+        os.remove(part)
+
+class HostSet:
+    """Compact, append-only set of hostnames for runs too large for a Python set of strings.
+
+    Hostnames are stored back to back in one bytearray, and an open-addressing index of their
+    positions answers membership. A host costs about 40 bytes, against roughly 110 in a set.
+    """
+
+    def __init__(self):
+        self.names = bytearray()
+        # Offsets are 32-bit, which caps the set at 4 GiB of hostnames
+        self.offsets = array.array('I', [0])
+        self.slots = array.array('i', [-1]) * 1024
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def find(self, name):
+        """Return the slot that holds `name` (as bytes), or the empty slot where it belongs."""
+        mask = len(self.slots) - 1
+        slot = hash(name) & mask
+        while True:
+            index = self.slots[slot]
+            if index < 0 or self.names[self.offsets[index]:self.offsets[index + 1]] == name:
+                return slot
+            slot = (slot + 1) & mask
+
+    def __contains__(self, subdomain):
+        return self.slots[self.find(subdomain.lower().encode())] >= 0
+
+    def add(self, subdomain):
+        """Add a hostname; returns False when it is already present."""
+        name = subdomain.lower().encode()
+        slot = self.find(name)
+        if self.slots[slot] >= 0:
+            return False
+        self.slots[slot] = len(self)
+        self.names += name
+        self.offsets.append(len(self.names))
+        # Keep the index at most half full so probe chains stay short
+        if len(self) * 2 > len(self.slots):
+            self.grow()
+        return True
+
+    def grow(self):
+        self.slots = array.array('i', [-1]) * (len(self.slots) * 2)
+        for index in range(len(self)):
+            self.slots[self.find(bytes(self.names[self.offsets[index]:self.offsets[index + 1]]))] = index
+
+def checkpoint_path(output_file):
+    """Return the checkpoint file that belongs to an output CSV."""
+    return output_file + ".checkpoint"
+
+def load_checkpoint(output_file):
+    """Return the saved checkpoint for `output_file`, or None if there is none."""
+    try:
+        with open(checkpoint_path(output_file), 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+def save_checkpoint(output_file, position, pending):
+    """Record how far into the input a scan got and which hosts were still in flight.
+
+    Every input entry before `position` is either written to the output or listed in `pending`.
+    The file is replaced atomically, so a crash mid-write leaves the previous checkpoint intact.
+    """
+    path = checkpoint_path(output_file)
+    temporary_path = path + ".tmp"
+    with open(temporary_path, 'w', encoding='utf-8') as file:
+        json.dump({"position": position, "pending": sorted(pending), "saved_at": time.time()}, file)
+    os.replace(temporary_path, path)
+
+def completed_subdomains(output_file):
+    """Return a HostSet of the subdomains already written to an output file."""
+    hosts = HostSet()
+    try:
+        for row in read_results(output_file):
+            if row.get("Subdomain"):
+                hosts.add(row["Subdomain"])
+    except (OSError, EOFError):
+        pass
+    return hosts
+
+class ResultStore:
+    """On-disk SQLite cache of probe results, keyed by hostname, for repeated scans of the same scope.
+
+    A stored row is served instead of probing again while it is younger than `ttl` seconds.
+    Rows are kept per column profile (see ProbeSettings.fieldnames) so a headers-mode run never
+    reuses a full-mode row. compact() drops rows older than `retention` seconds and then the
+    oldest rows beyond `max_rows`, so the file stays bounded however often the scope is rescanned.
+    """
+
+    def __init__(self, path, ttl=24 * 3600, retention=30 * 24 * 3600, max_rows=1000000, profile=""):
+        self.path = path
+        self.ttl = ttl
+        self.retention = retention
+        self.max_rows = max_rows
+        self.profile = profile
+        self.hits = 0
+        self.writes = 0
+        self.pending_writes = 0
+        self.lock = threading.Lock()
+        # One connection shared by the probe threads; the lock serialises access to it
+        # Shard processes share the file, so wait for another writer's lock instead of failing
+        self.connection = sqlite3.connect(path, timeout=60, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "subdomain TEXT NOT NULL, profile TEXT NOT NULL, checked_at REAL NOT NULL, "
+            "status TEXT, accessible TEXT, fingerprint TEXT, row TEXT NOT NULL, "
+            "PRIMARY KEY (subdomain, profile))")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS results_checked_at ON results (checked_at)")
+        self.compact()
+
+    def get(self, subdomain):
+        """Return the stored row for `subdomain` if it is still fresh, otherwise None."""
+        with self.lock:
+            found = self.connection.execute(
+                "SELECT row FROM results WHERE subdomain = ? AND profile = ? AND checked_at > ?",
+                (subdomain.lower(), self.profile, time.time() - self.ttl)).fetchone()
+        if found is None:
+            return None
+        self.hits += 1
+        return json.loads(found[0])
+
+    def put(self, result):
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (result["Subdomain"].lower(), self.profile, time.time(), str(result["Status Code"]),
+                 result["Accessible"], result.get("Cluster"), json.dumps(result)))
+            # Batch commits so a busy scan does not sync the file for every row
+            self.writes += 1
+            self.pending_writes += 1
+            if self.pending_writes >= RESULT_STORE_COMMIT_EVERY:
+                self.connection.commit()
+                self.pending_writes = 0
+
+    def compact(self):
+        """Evict expired rows and cap the store at `max_rows`, oldest first."""
+        with self.lock:
+            self.connection.execute("DELETE FROM results WHERE checked_at < ?", (time.time() - self.retention,))
+            self.connection.execute(
+                "DELETE FROM results WHERE rowid IN (SELECT rowid FROM results ORDER BY checked_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_rows,))
+            self.connection.commit()
+            self.pending_writes = 0
+
+    def close(self):
+        self.compact()
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+# Set in shard processes of a --workers run: their info messages are dropped and the rest labelled
+SHARD_LABEL = None
 
 def print_status(message, message_type="info"):
     """Print a status message with a timestamp and color coding based on message type."""
+    if SHARD_LABEL is not None:
+        if message_type == "info":
+            return
+        message = f"[{SHARD_LABEL}] {message}"
+
     # Default to informational messages (blue)
     color = Fore.BLUE
 
@@ -139,97 +2542,1179 @@ def print_status(message, message_type="info"):
 
     print(f"{color}[{time.strftime('%H:%M:%S')}] {message}{Style.RESET_ALL}")
 
+class ResolvingProxyHandler(socketserver.BaseRequestHandler):
+    """Relay one browser connection to the address the DNS cache holds for its target host.
+
+    HTTPS arrives as CONNECT and is tunnelled untouched, so the browser still does TLS (and SNI)
+    with the real hostname. Plain HTTP requests are rewritten to origin form with
+    `Connection: close`, so every proxied connection serves exactly one host.
+    """
+
+    def handle(self):
+        client = self.request
+        client.settimeout(PROXY_IDLE_TIMEOUT)
+        head = b""
+        while b"\r\n\r\n" not in head:
+            chunk = client.recv(65536)
+            if not chunk or len(head) > 65536:
+                return
+            head += chunk
+        head, body = head.split(b"\r\n\r\n", 1)
+        request_line, *header_lines = head.decode("latin-1").split("\r\n")
+        method, target, version = request_line.split(" ", 2)
+
+        if method == "CONNECT":
+            host, _, port = target.rpartition(":")
+            upstream = self.connect(host.strip("[]"), int(port))
+            if upstream is None:
+                client.sendall(b"HTTP/1.1 502 Bad Gateway\r\n\r\n")
+                return
+            client.sendall(b"HTTP/1.1 200 Connection Established\r\n\r\n")
+        else:
+            url = urlsplit(target)
+            upstream = self.connect(url.hostname, url.port or 80)
+            if upstream is None:
+                client.sendall(b"HTTP/1.1 502 Bad Gateway\r\nContent-Length: 0\r\n\r\n")
+                return
+            path = (url.path or "/") + (f"?{url.query}" if url.query else "")
+            headers = [line for line in header_lines
+                       if line.split(":", 1)[0].strip().lower() not in ("connection", "proxy-connection", "keep-alive")]
+            head = "\r\n".join([f"{method} {path} {version}"] + headers + ["Connection: close"])
+            upstream.sendall(head.encode("latin-1") + b"\r\n\r\n")
+
+        try:
+            if body:
+                upstream.sendall(body)
+            self.relay(client, upstream)
+        finally:
+            upstream.close()
+
+    def connect(self, host, port):
+        for address in self.server.cache.addresses(host) or [host]:
+            try:
+                return socket.create_connection((address, port), timeout=PROXY_IDLE_TIMEOUT)
+            except OSError:
+                pass
+        return None
+
+    @staticmethod
+    def relay(client, upstream):
+        """Copy bytes both ways until either side closes or the connection goes idle."""
+        sockets = [client, upstream]
+        while True:
+            readable, _, _ = select.select(sockets, [], [], PROXY_IDLE_TIMEOUT)
+            if not readable:
+                return
+            for source in readable:
+                data = source.recv(65536)
+                if not data:
+                    return
+                (upstream if source is client else client).sendall(data)
+
+class ResolvingProxy(socketserver.ThreadingTCPServer):
+    """Loopback HTTP proxy that makes the screenshot browsers use the shared DNS cache."""
+
+    daemon_threads = True
+
+    def __init__(self, cache=None):
+        self.cache = cache or DNS_CACHE
+        super().__init__(("127.0.0.1", 0), ResolvingProxyHandler)
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def close(self):
+        self.shutdown()
+        self.server_close()
+
+def new_chrome_driver(settings=None, proxy_url=None):
+    """Start a headless Chrome instance configured for screenshots."""
+    options = webdriver.ChromeOptions()
+    options.add_argument("--headless")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--no-sandbox")
+    if proxy_url:
+        # Route page loads through the resolving proxy so Chrome skips its own DNS lookups
+        options.add_argument(f"--proxy-server={proxy_url}")
+
+    fast = settings is not None and settings.profile == "fast"
+    if fast:
+        # Return control once the DOM is ready instead of waiting for every subresource
+        options.page_load_strategy = "eager"
+        options.add_argument(f"--window-size={settings.viewport[0]},{settings.viewport[1]}")
+        options.add_argument("--mute-audio")
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+
+    driver = webdriver.Chrome(options=options)
+
+    if fast:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": FAST_BLOCKED_URLS})
+        driver.set_page_load_timeout(settings.page_budget)
+    else:
+        driver.set_page_load_timeout(10)
+    return driver
+
+def screenshot_path(subdomain, folder, settings=None):
+    """Return where a capture of `subdomain` is saved in `folder` with these screenshot settings."""
+    extension = "png"
+    if settings is not None and settings.profile == "fast":
+        extension = "jpg" if settings.image_format == "jpeg" else settings.image_format
+    return os.path.join(folder, f"{subdomain.replace('.', '_')}.{extension}")
+
+def capture_screenshot(driver, subdomain, folder, settings=None):
+    """Load a subdomain in an existing driver and save a screenshot of it into `folder`."""
+    if settings is not None and settings.profile == "fast":
+        return capture_fast_screenshot(driver, subdomain, folder, settings)
+
+    url = f"http://{subdomain}"
+    driver.get(url)
+
+    path = screenshot_path(subdomain, folder)
+    driver.save_screenshot(path)
+
+    print_status(f"Screenshot saved: {path}", message_type="success")
+    return path
+
+def capture_fast_screenshot(driver, subdomain, folder, settings):
+    """Capture the visible viewport as a compressed image within a hard per-page time budget."""
+    url = f"http://{subdomain}"
+    try:
+        driver.get(url)
+    except selenium_exceptions.TimeoutException:
+        # Out of budget: stop loading and keep whatever has rendered so far
+        driver.execute_script("window.stop();")
+
+    # Step the quality down until the image fits in the size budget
+    quality = settings.image_quality
+    while True:
+        capture = driver.execute_cdp_cmd("Page.captureScreenshot", {"format": settings.image_format, "quality": quality})
+        image = base64.b64decode(capture["data"])
+        if len(image) <= settings.max_image_bytes or quality <= 20:
+            break
+        quality -= 20
+
+    path = screenshot_path(subdomain, folder, settings)
+    with open(path, "wb") as image_file:
+        image_file.write(image)
+
+    print_status(f"Screenshot saved: {path}", message_type="success")
+    return path
+
 def take_screenshot(subdomain, folder):
     """Take a screenshot of a subdomain and save it in the specified folder."""
     try:
         # Ensure the folder exists
         os.makedirs(folder, exist_ok=True)
 
-        options = Options()
-        options.add_argument("--headless")
-        options.add_argument("--disable-gpu")
-        options.add_argument("--no-sandbox")
-        driver = webdriver.Chrome(options=options)
+        with METRICS.track("browser_start"):
+            driver = new_chrome_driver()
+        try:
+            with METRICS.track("screenshot"):
+                capture_screenshot(driver, subdomain, folder)
+            METRICS.count("screenshots")
+        finally:
+            driver.quit()
 
-        url = f"http://{subdomain}"
-        driver.set_page_load_timeout(10)
-        driver.get(url)
+    except Exception as e:
+        METRICS.error("screenshot", e)
+        print_status(f"Failed to take screenshot of {subdomain}: {e}", message_type="error")
 
-        screenshot_path = os.path.join(folder, f"{subdomain.replace('.', '_')}.png")
-        driver.save_screenshot(screenshot_path)
+class ScreenshotSettings:
+    """Options for the screenshot pool."""
 
-        print_status(f"Screenshot saved: {screenshot_path}", message_type="success")
+    def __init__(self, workers=4, recycle_after=50, profile="full", page_budget=4, image_format="jpeg",
+                 image_quality=70, max_image_bytes=150 * 1024, viewport=(800, 600)):
+        # Number of long-lived Chrome instances capturing in parallel
+        self.workers = workers
+        # Restart a driver after this many pages to keep leaked memory in check
+        self.recycle_after = recycle_after
+        # "full" waits for a complete page load and saves a PNG; "fast" is the lightweight triage profile
+        self.profile = profile
+        # The remaining options only apply to the fast profile
+        self.page_budget = page_budget
+        self.image_format = image_format
+        self.image_quality = image_quality
+        self.max_image_bytes = max_image_bytes
+        self.viewport = viewport
 
-        driver.quit()
+class ScreenshotPool:
+    """A fixed set of worker threads, each owning a long-lived headless Chrome driver.
 
-    except Exception as e:
-        print_status(f"Failed to take screenshot of {subdomain}: {e}", message_type="error")
+    Drivers are started lazily, restarted after `recycle_after` pages and replaced whenever
+    a capture fails for any reason other than a page load timeout.
+    """
+
+    def __init__(self, folder, settings=None, dns_cache=None):
+        self.folder = folder
+        self.settings = settings or ScreenshotSettings()
+        os.makedirs(folder, exist_ok=True)
+        # With a DNS cache, browsers connect through a loopback proxy that uses it
+        self.proxy = ResolvingProxy(dns_cache) if dns_cache is not None else None
+        # Bounded so producers block instead of queueing every accessible host in memory
+        self.queue = queue.Queue(maxsize=self.settings.workers * 2)
+        self.threads = [threading.Thread(target=self._worker, daemon=True) for _ in range(self.settings.workers)]
+        for thread in self.threads:
+            thread.start()
+
+    def submit(self, subdomain):
+        """Queue a subdomain for capture, blocking while every worker is busy."""
+        self.queue.put(subdomain)
+
+    def captured(self, subdomain):
+        """Tell whether this pool's folder already holds a screenshot of `subdomain`."""
+        return os.path.exists(screenshot_path(subdomain, self.folder, self.settings))
+
+    def close(self):
+        """Wait for queued captures to finish and shut every driver down."""
+        for _ in self.threads:
+            self.queue.put(None)
+        for thread in self.threads:
+            thread.join()
+        if self.proxy is not None:
+            self.proxy.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _worker(self):
+        with profiled("screenshot"):
+            driver = None
+            pages = 0
+            while True:
+                subdomain = self.queue.get()
+                if subdomain is None:
+                    break
+
+                try:
+                    if driver is None:
+                        with METRICS.track("browser_start"):
+                            driver = new_chrome_driver(self.settings, self.proxy.url if self.proxy is not None else None)
+                        pages = 0
+                    pages += 1
+                    with METRICS.track("screenshot"):
+                        capture_screenshot(driver, subdomain, self.folder, self.settings)
+                    METRICS.count("screenshots")
+                except selenium_exceptions.TimeoutException as e:
+                    # The page was slow, but the browser itself is still healthy
+                    METRICS.error("screenshot", e)
+                    print_status(f"Failed to take screenshot of {subdomain}: {e}", message_type="error")
+                except Exception as e:
+                    METRICS.error("screenshot", e)
+                    print_status(f"Failed to take screenshot of {subdomain}: {e}", message_type="error")
+                    driver = self._quit(driver)
+
+                if driver is not None and pages >= self.settings.recycle_after:
+                    driver = self._quit(driver)
+
+            self._quit(driver)
 
+    @staticmethod
+    def _quit(driver):
+        """Quit a driver, ignoring errors from one that has already crashed."""
+        if driver is not None:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+        return None
 
 # Example of logging DevTools messages in yellow
 def log_devtools_message(message):
     """Log DevTools related messages in yellow."""
     print_status(message, message_type="warning")
 
-def check_subdomains_concurrently(subdomain_list, output_file, snapshot_folder=None, concurrency=10):
-    """Check subdomains concurrently, save results to a CSV file, and optionally take screenshots."""
+class ScanSettings:
+    """Options for the scan pipeline as a whole."""
+
+    def __init__(self, concurrency=10, engine="thread", resolve_workers=200, resume=False, ordered_input=True,
+                 limiter=None, host_limits=None, validated=False):
+        # Probes in flight, run by a thread pool ("thread") or on one event loop ("async")
+        self.concurrency = concurrency
+        self.engine = engine
+        # DNS lookups in flight in the resolve stage
+        self.resolve_workers = resolve_workers
+        # Append to an existing output and skip the work it already holds
+        self.resume = resume
+        # The input is read the same way again on resume (a file, not an enumeration)
+        self.ordered_input = ordered_input
+        # AdaptiveConcurrency that replaces the fixed concurrency
+        self.limiter = limiter
+        # HostRateLimiter that paces probes per IP and per parent domain
+        self.host_limits = host_limits
+        # The input has been through normalize_subdomains, so names are not checked again
+        self.validated = validated
+
+def check_subdomains_concurrently(subdomain_list, output_file, snapshot_folder=None, scan_settings=None, settings=None, screenshot_settings=None,
+                                  dns_cache=None, result_store=None, progress=None, on_result=None):
+    """Check subdomains concurrently, save results to a CSV file, and optionally take screenshots.
+
+    The work runs as a pipeline: the calling thread feeds `subdomain_list` (enumeration) into an
+    async DNS resolve stage, live names flow into the probe stage with their records, and accessible
+    hosts go straight to the screenshot pool. Stages are joined by bounded queues and each has its
+    own worker budget, so a slow stage throttles its producers instead of buffering the whole run.
+    Every stage shares `dns_cache` (the process-wide DNS_CACHE by default), so each name is
+    looked up once and the probes and browsers connect straight to the cached address.
+    With a `result_store`, hosts that have a fresh stored result skip every stage: the stored row
+    is written as-is (no probe, no screenshot) and only missing or stale hosts are checked.
+
+    Progress is checkpointed next to the output every CHECKPOINT_INTERVAL seconds. With `resume`
+    (see ScanSettings), rows are appended to the existing output and finished work is skipped: an
+    `ordered_input` fast-forwards to the checkpointed position and re-checks the hosts that were in
+    flight, while other inputs skip every host already in the output.
+    SIGINT/SIGTERM stop the feed, let in-flight probes finish and flush; a second signal aborts.
+    With a `limiter` (AdaptiveConcurrency) the probe stage runs up to its maximum workers and
+    the limiter adjusts how many probe at once; `concurrency` is then only the starting point.
+    With `host_limits` (HostRateLimiter) a scheduler stage between resolving and probing holds
+    back hosts whose IP or parent domain is out of tokens and lets other targets through first.
+    `progress` (a shared multiprocessing.Value) replaces the progress bar in shard processes.
+    `on_result` is called with every row as it is written (a lease worker streams rows back with it).
+    """
+    if scan_settings is None:
+        scan_settings = ScanSettings()
+    concurrency, engine, resolve_workers = scan_settings.concurrency, scan_settings.engine, scan_settings.resolve_workers
+    resume, ordered_input, validated = scan_settings.resume, scan_settings.ordered_input, scan_settings.validated
+    limiter, host_limits = scan_settings.limiter, scan_settings.host_limits
+    if dns_cache is None:
+        dns_cache = DNS_CACHE
+    install_requests_dns_cache(dns_cache)
+    install_requests_timing()
+    if settings is None:
+        settings = ProbeSettings()
+    if screenshot_settings is None:
+        screenshot_settings = ScreenshotSettings()
+
     if concurrency <= 0:
         print_status("Invalid concurrency value. Falling back to default: 10.")
         concurrency = 10
 
-    print_status(f"Checking accessibility of {len(subdomain_list)} subdomains with concurrency: {concurrency}...")
-    with ThreadPoolExecutor(max_workers=concurrency) as executor:
-        results = list(tqdm(executor.map(check_subdomain, subdomain_list), total=len(subdomain_list), desc="Checking subdomains"))
+    if engine == "async" and aiohttp is None:
+        print_status("The async engine requires aiohttp (pip install aiohttp). Falling back to the thread engine.", message_type="warning")
+        engine = "thread"
+
+    resolve_workers = max(1, resolve_workers)
+    probe_workers = limiter.maximum if limiter is not None else concurrency
+    # The async engine consumes its inbox from a single thread, and the adaptive thread engine's
+    # growable stage passes a single end marker from worker to worker
+    probe_consumers = 1 if engine == "async" or limiter is not None else probe_workers
+    resolve_queue = queue.Queue(maxsize=resolve_workers * STAGE_QUEUE_FACTOR)
+    probe_queue = queue.Queue(maxsize=probe_workers * STAGE_QUEUE_FACTOR)
+    # With per-host limits, resolved names pass through the rate-limit scheduler first
+    resolved_queue = probe_queue if host_limits is None else queue.Queue(maxsize=resolve_workers * STAGE_QUEUE_FACTOR)
+    resolved_consumers = probe_consumers if host_limits is None else 1
+
+    total = len(subdomain_list) if hasattr(subdomain_list, "__len__") else None
+    print_status(f"Checking accessibility of {total if total is not None else 'streamed'} subdomains with concurrency: {concurrency} ({engine} engine)...")
+    probe_label = concurrency if limiter is None else f"adaptive {limiter.minimum}-{limiter.maximum}"
+    print_status(f"Pipeline workers - DNS lookups: {resolve_workers}, probe: {probe_label}, screenshots: {screenshot_settings.workers if snapshot_folder is not None else 0}")
+
+    # With fingerprinting, only the first accessible host of each content cluster is screenshotted
+    seen_clusters = set()
+    record_lock = threading.Lock()
+    screenshots_queued = 0
+
+    # Resume state: entries to fast-forward past, hosts to re-check first and hosts to skip
+    skip_entries, retry, done = 0, [], set()
+    checkpoint = load_checkpoint(output_file) if resume else None
+    if resume and ordered_input and checkpoint is not None:
+        skip_entries, retry = checkpoint["position"], checkpoint["pending"]
+
+    # Checkpoint state, guarded by record_lock: input entries consumed and hosts not yet written
+    position = skip_entries
+    in_flight = {}
+    stopping = threading.Event()
+
+    def request_stop(signum, frame):
+        if stopping.is_set():
+            raise KeyboardInterrupt
+        print_status("Stopping: finishing in-flight probes and saving a checkpoint (signal again to abort).", message_type="warning")
+        stopping.set()
+
+    def checkpoint_main():
+        while not stopping.wait(CHECKPOINT_INTERVAL):
+            write_checkpoint()
+
+    def write_checkpoint():
+        with record_lock:
+            # Rows no longer in flight must be on disk before the checkpoint says so
+            writer.flush()
+            save_checkpoint(output_file, position, list(in_flight))
+
+    previous_handlers = {}
+    if threading.current_thread() is threading.main_thread():
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            previous_handlers[signum] = signal.signal(signum, request_stop)
+
+    with open_result_writer(output_file, settings.fieldnames() + DNS_FIELDNAMES, append=resume) as writer, \
+            (ScreenshotPool(snapshot_folder, screenshot_settings, dns_cache) if snapshot_folder is not None else contextlib.nullcontext()) as pool, \
+            tqdm.tqdm(total=total, desc="Checking subdomains", disable=progress is not None) as pbar:
+        writer.skip_invalid = not validated
+        if resume:
+            # Read once the writer has dropped a row cut short; rows written after the last
+            # checkpoint are in the output too, so they are not probed twice
+            done = completed_subdomains(output_file)
+            retry = [subdomain for subdomain in retry if subdomain not in done]
+            if checkpoint is not None and ordered_input:
+                print_status(f"Resuming after input entry {skip_entries} with {len(retry)} in-flight host(s) to re-check "
+                             f"({len(done)} host(s) already in {output_file}).")
+            else:
+                print_status(f"Resuming: skipping {len(done)} host(s) already in {output_file}.")
 
-    write_filtered_to_csv(results, output_file)
+        def record(result, cached=False):
+            nonlocal screenshots_queued
+            if settings.root_domains:
+                result["Root Domain"] = root_domain(result["Subdomain"], settings.root_domains)
+            if result_store is not None and not cached:
+                result_store.put(result)
+            with record_lock:
+                writer.write(result)
+                pbar.update(1)
+                if progress is not None:
+                    with progress.get_lock():
+                        progress.value += 1
+                if on_result is not None:
+                    on_result(result)
+                # Written rows leave the checkpoint's in-flight list
+                subdomain = result["Subdomain"]
+                if in_flight.get(subdomain, 0) > 1:
+                    in_flight[subdomain] -= 1
+                else:
+                    in_flight.pop(subdomain, None)
+                cluster = result.get("Cluster")
+                # Without -s there is no pool and nothing more to do
+                if pool is None or result["Accessible"] != "Yes" or (cluster and cluster in seen_clusters):
+                    return
+                if cluster:
+                    seen_clusters.add(cluster)
+                # A cached row may come from a run without -s, with another folder or whose capture
+                # failed, so only a screenshot already in this run's folder makes a new one unnecessary
+                if cached and (not screenshot_settings.workers or pool.captured(result["Subdomain"])):
+                    return
+                screenshots_queued += 1
+            # Submitting outside the lock lets other probes keep writing while the pool is full
+            pool.submit(result["Subdomain"])
 
-    # Default folder for snapshots
-    if snapshot_folder is None:
-        snapshot_folder = "snapshots"
+        def resolved(subdomain, records):
+            resolved_queue.put((subdomain, records))
 
-    # Take screenshots of accessible subdomains
-    accessible_subdomains = [result for result in results if result["Accessible"] == "Yes"]
+        def dead(subdomain):
+            # NXDOMAIN: never worth opening a socket for
+            record(unreachable_result(subdomain, settings, "NXDOMAIN"))
 
-    os.makedirs(snapshot_folder, exist_ok=True)
-    if accessible_subdomains:
-        print_status("Taking screenshots of accessible subdomains...")
-        for result in accessible_subdomains:
-            take_screenshot(result["Subdomain"], snapshot_folder)
+        def unless_stopping(items):
+            # After a stop request queued hosts are dropped unprobed; the checkpoint keeps them pending
+            for item in items:
+                if not stopping.is_set():
+                    yield item
+
+        def probe(item):
+            if stopping.is_set():
+                return
+            subdomain, records = item
+            if limiter is None:
+                result = check_subdomain(subdomain, settings, validated)
+            else:
+                limiter.acquire()
+                started = time.monotonic()
+                result = None
+                try:
+                    result = check_subdomain(subdomain, settings, validated)
+                finally:
+                    elapsed = time.monotonic() - started
+                    limiter.release(elapsed, is_probe_timeout(result, elapsed, settings))
+                if int(limiter.limit) > len(probe_stage.threads):
+                    probe_stage.grow(int(limiter.limit))
+            result.update(records)
+            record(result)
+
+        def resolve_stage_main():
+            try:
+                with profiled("resolve"):
+                    asyncio.run(resolve_subdomains_async(unless_stopping(iter_queue(resolve_queue)), resolve_workers, resolved, dead, dns_cache, validated))
+            finally:
+                for _ in range(resolved_consumers):
+                    resolved_queue.put(_STAGE_DONE)
+
+        resolve_stage = threading.Thread(target=resolve_stage_main, daemon=True)
+        resolve_stage.start()
+        if host_limits is not None:
+            scheduler = RateLimitScheduler(host_limits, resolved_queue, probe_queue, probe_consumers, stopping).start()
+        if engine == "async":
+            def probe_stage_main():
+                with profiled("probe"):
+                    asyncio.run(check_subdomains_async(unless_stopping(iter_queue(probe_queue)), concurrency, settings, on_result=record,
+                                                       limiter=limiter, validated=validated))
+
+            probe_stage = threading.Thread(target=probe_stage_main, daemon=True)
+            probe_stage.start()
+        else:
+            # Adaptive runs start with the limiter's initial limit and add threads as it rises
+            probe_stage = PipelineStage("Probe", probe_workers if limiter is None else int(limiter.limit), probe, probe_queue,
+                                        growable=limiter is not None)
+            probe_stage.start()
+
+        def feed(subdomain, advance):
+            nonlocal position
+            with record_lock:
+                in_flight[subdomain] = in_flight.get(subdomain, 0) + 1
+                position += advance
+            stored = result_store.get(subdomain) if result_store is not None else None
+            if stored is not None:
+                record(stored, cached=True)
+            else:
+                resolve_queue.put(subdomain)
+
+        checkpointer = threading.Thread(target=checkpoint_main, daemon=True)
+        checkpointer.start()
+        try:
+            # Enumeration stage: pull from the source only as fast as the resolvers keep up
+            with profiled("feed"):
+                for subdomain in retry:
+                    feed(subdomain, 0)
+                source = itertools.islice(subdomain_list, skip_entries, None)
+                for subdomain in source:
+                    if stopping.is_set():
+                        break
+                    if subdomain in done:
+                        with record_lock:
+                            position += 1
+                        continue
+                    feed(subdomain, 1)
+            resolve_queue.put(_STAGE_DONE)
+
+            resolve_stage.join()
+            if host_limits is not None:
+                scheduler.join()
+            probe_stage.join()
+            finished = not stopping.is_set()
+            if screenshots_queued:
+                print_status(f"Waiting for {screenshot_settings.workers} browser(s) to finish screenshots...")
+        finally:
+            stopping.set()
+            checkpointer.join()
+            for signum, handler in previous_handlers.items():
+                signal.signal(signum, handler)
+            # Whatever happened, the output holds every written row; record where the feed stopped
+            write_checkpoint()
+
+    if limiter is not None:
+        print_status(f"Adaptive concurrency settled at {limiter.settled()} in-flight probes (bounds {limiter.minimum}-{limiter.maximum}).")
+    if finished:
+        os.remove(checkpoint_path(output_file))
     else:
+        print_status(f"Scan interrupted; progress saved to {checkpoint_path(output_file)}. Rerun with --resume to continue.", message_type="warning")
+    dns_cache.save()
+    if result_store is not None:
+        print_status(f"{result_store.hits} result(s) served from {result_store.path}; {result_store.writes} host(s) checked.")
+    print_status(f"Filtered results saved to {output_file}")
+    if snapshot_folder is not None and not screenshots_queued and not (result_store is not None and result_store.hits):
         print_status("No accessible domains found, therefore no screenshots to capture.", message_type="error")
 
-if __name__ == "__main__":
+def run_scan(args, subdomain_list, output_file, ordered_input=True, shards=1, progress=None, on_result=None, validated=True):
+    """Build a scan from parsed command-line arguments and run it, sharded if --workers asks for it.
+
+    Inside a shard (`shards` > 1) the global rates and the browser budget are split evenly,
+    so N shards together honour the limits given on the command line. `subdomain_list` has been
+    through normalize_subdomains unless `validated` is False.
+    """
+    if getattr(args, "coordinator", None):
+        return run_coordinator(args, subdomain_list, output_file, args.coordinator)
+    if args.workers > 1 and shards == 1:
+        return check_subdomains_sharded(args, subdomain_list, output_file, args.workers, ordered_input)
+
+    settings = ProbeSettings(args.probe_mode, args.max_redirects, args.connect_timeout, args.read_timeout,
+                             args.cluster, max(1, args.fingerprint_kb) * 1024, args.root_domains)
+    screenshot_settings = ScreenshotSettings(max(1, -(-args.screenshot_workers // shards)), max(1, args.recycle_after),
+                                             args.render_profile, args.page_budget, args.image_format)
+
+    if args.dns_cache:
+        DNS_CACHE.path = args.dns_cache
+        DNS_CACHE.load()
+    limiter = AdaptiveConcurrency(args.concurrency, args.min_concurrency, args.max_concurrency) if args.adaptive else None
+    host_limits = None
+    if args.per_ip_rate or args.per_domain_rate:
+        # An unset side of the limit gets a bucket that never runs dry in practice
+        host_limits = HostRateLimiter((args.per_ip_rate or 1e9) / shards, max(1, args.rate_burst // shards),
+                                      (args.per_domain_rate or 1e9) / shards, max(1, args.rate_burst // shards))
+    result_store = None
+    if args.result_cache:
+        result_store = ResultStore(args.result_cache, args.cache_ttl * 3600, args.cache_retention * 86400,
+                                   max(1, args.cache_max_rows), ",".join(settings.fieldnames()))
+
+    METRICS.reset()
+    exporter_stop = threading.Event()
+    if args.prometheus:
+        def export_main():
+            while not exporter_stop.wait(METRICS_INTERVAL):
+                METRICS.write_prometheus(args.prometheus)
+        threading.Thread(target=export_main, daemon=True).start()
+
+    try:
+        scan_settings = ScanSettings(args.concurrency, args.engine, args.resolve_workers, args.resume, ordered_input, limiter, host_limits, validated)
+        check_subdomains_concurrently(subdomain_list, output_file, args.snapshots, scan_settings, settings, screenshot_settings,
+                                      result_store=result_store, progress=progress, on_result=on_result)
+    finally:
+        if result_store is not None:
+            result_store.close()
+        exporter_stop.set()
+        if args.prometheus:
+            METRICS.write_prometheus(args.prometheus)
+        if args.metrics_json:
+            METRICS.write_json(args.metrics_json)
+        print_status(METRICS.headline())
+
+def shard_path(output_file, index):
+    """Return the part file a shard writes before the parts are merged into `output_file`."""
+    root, extension = split_output_extension(output_file)
+    return f"{root}.part{index}{extension or '.csv'}"
+
+def shard_index(subdomain, workers):
+    """Return the shard a host belongs to; the same name always lands on the same shard."""
+    return zlib.crc32(subdomain.lower().encode()) % workers
+
+def shard_metrics(args, index):
+    """Give a shard process its own metrics files next to the ones named on the command line, and its own profiler."""
+    global PROFILER
+    for name in ("metrics_json", "prometheus"):
+        if getattr(args, name):
+            setattr(args, name, shard_path(getattr(args, name), index))
+    if PROFILER is not None:
+        # The profiler inherited through fork lost its sampler thread and holds the parent's stats
+        PROFILER = StageProfiler(PROFILER.directory, f"part{index}")
+
+def run_shard(args, index, inbox, progress, output_file, ordered_input):
+    """Entry point of one shard process: scan the hosts sent on `inbox` into its own part file."""
+    global SHARD_LABEL
+    SHARD_LABEL = f"shard {index}"
+    shard_metrics(args, index)
+    # A session of its own keeps terminal Ctrl+C away; the coordinator forwards stop requests
+    if hasattr(os, "setsid"):
+        os.setsid()
+    try:
+        run_scan(args, iter(inbox.get, None), shard_path(output_file, index), ordered_input, args.workers, progress)
+    finally:
+        finish_profile()
+
+def check_subdomains_sharded(args, subdomain_list, output_file, workers, ordered_input=True):
+    """Split a scan across `workers` processes, each running the full pipeline on its share of hosts.
+
+    Hosts are assigned by a stable hash of their name, so a resumed run sends every host to the
+    same shard (and part file) as before. Shards report progress through one shared counter and
+    the parts are merged into `output_file` once every shard has finished. A stop request is
+    forwarded to the shards as SIGTERM, which each drains as in a single-process run.
+    """
+    print_status(f"Sharding the scan across {workers} worker processes ({args.concurrency} concurrent probes each)...")
+    progress = multiprocessing.Value('q', 0)
+    inboxes = [multiprocessing.Queue(maxsize=args.concurrency * STAGE_QUEUE_FACTOR * 4) for _ in range(workers)]
+    processes = [multiprocessing.Process(target=run_shard, args=(args, index, inbox, progress, output_file, ordered_input), daemon=True)
+                 for index, inbox in enumerate(inboxes)]
+    for process in processes:
+        process.start()
+    for inbox in inboxes:
+        # Shards that stop early leave items behind; exiting must not wait to flush them
+        inbox.cancel_join_thread()
+
+    stopping = threading.Event()
+
+    def request_stop(signum, frame):
+        if not stopping.is_set():
+            print_status("Stopping: asking every shard to finish its in-flight probes (signal again to abort).", message_type="warning")
+        stopping.set()
+        for process in processes:
+            if process.is_alive():
+                os.kill(process.pid, signal.SIGTERM)
+
+    def feed():
+        for subdomain in subdomain_list:
+            inbox = inboxes[shard_index(subdomain, workers)]
+            while not stopping.is_set():
+                try:
+                    inbox.put(subdomain, timeout=0.5)
+                    break
+                except queue.Full:
+                    continue
+            if stopping.is_set():
+                return
+        for inbox in inboxes:
+            inbox.put(None)
+
+    previous_handlers = {signum: signal.signal(signum, request_stop) for signum in (signal.SIGINT, signal.SIGTERM)}
+    threading.Thread(target=feed, daemon=True).start()
+    try:
+        with tqdm.tqdm(desc="Checking subdomains") as pbar:
+            while any(process.is_alive() for process in processes):
+                time.sleep(0.2)
+                pbar.update(progress.value - pbar.n)
+            pbar.update(progress.value - pbar.n)
+    finally:
+        for signum, handler in previous_handlers.items():
+            signal.signal(signum, handler)
+
+    parts = [shard_path(output_file, index) for index in range(workers)]
+    unfinished = [part for part in parts if os.path.exists(checkpoint_path(part))]
+    if stopping.is_set() or unfinished or any(process.exitcode != 0 for process in processes):
+        print_status(f"Scan incomplete; shard results are kept in {', '.join(parts)}. Rerun with --resume to continue.", message_type="warning")
+        return
+
+    merge_result_files(parts, output_file)
+    print_status(f"Merged {workers} shard outputs into {output_file}.")
+
+def parse_address(address):
+    """Split HOST:PORT into a (host, port) tuple; a bare :PORT means this machine only (127.0.0.1)."""
+    host, _, port = address.rpartition(":")
+    return host.strip("[]") or "127.0.0.1", int(port)
+
+def is_loopback(host):
+    """Tell whether `host` (a name or an IP literal) only accepts connections from this machine."""
+    if host.lower() == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+class Lease:
+    """A batch of hosts handed to one worker connection, with the hosts still missing a result."""
+
+    def __init__(self, lease_id, hosts, holder, timeout):
+        self.id = lease_id
+        self.holder = holder
+        self.remaining = {}
+        for host in hosts:
+            self.remaining[host] = self.remaining.get(host, 0) + 1
+        self.timeout = timeout
+        self.touch()
+
+    def touch(self):
+        self.deadline = time.monotonic() + self.timeout
+
+    def hosts(self):
+        return [host for host, count in self.remaining.items() for _ in range(count)]
+
+class LeaseHandler(socketserver.StreamRequestHandler):
+    """Serve one worker connection of the newline-delimited JSON lease protocol.
+
+    The worker opens with {"type": "hello", "token": ...} and is answered with the probe settings.
+    After that it sends "lease" requests (answered with "lease", "wait" or "done"), "result" rows
+    tagged with their lease id, and "heartbeat" messages listing the leases it still holds.
+    """
+
+    def handle(self):
+        server = self.server
+        try:
+            hello = json.loads(self.rfile.readline() or b"{}")
+            if hello.get("type") != "hello" or hello.get("token") != server.token:
+                self.send({"type": "error", "message": "bad hello or token"})
+                return
+            self.send({"type": "welcome", "settings": server.settings, "lease_timeout": server.lease_timeout})
+            for line in self.rfile:
+                message = json.loads(line)
+                kind = message.get("type")
+                if kind == "lease":
+                    lease = server.grant(self)
+                    if lease == "done":
+                        self.send({"type": "done"})
+                    elif lease is None:
+                        self.send({"type": "wait"})
+                    else:
+                        self.send({"type": "lease", "id": lease.id, "hosts": lease.hosts()})
+                elif kind == "result":
+                    server.accept(self, message["lease"], message["row"])
+                elif kind == "heartbeat":
+                    server.heartbeat(self, message["leases"])
+        except (OSError, ValueError, KeyError):
+            pass
+        finally:
+            # A vanished worker's leases go straight back to the queue
+            server.release(self)
+
+    def send(self, message):
+        self.wfile.write((json.dumps(message) + "\n").encode())
+        self.wfile.flush()
+
+class LeaseCoordinator(socketserver.ThreadingTCPServer):
+    """TCP coordinator that splits an input stream into leases for distributed workers.
+
+    Leases are cut from the input lazily, LEASE_SIZE hosts at a time. A lease whose holder
+    disconnects, or sends no result or heartbeat for `lease_timeout` seconds, goes back to the
+    queue with the hosts it has not reported yet. A row is accepted from any worker while its host
+    is still outstanding in some lease, so a slow worker's late results are not wasted, and
+    every input host is written to `writer` exactly once.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, subdomain_list, writer, settings, lease_size=LEASE_SIZE, lease_timeout=LEASE_TIMEOUT, token="", skip=None):
+        self.source = iter(subdomain_list)
+        self.writer = writer
+        self.settings = settings
+        self.lease_size = lease_size
+        self.lease_timeout = lease_timeout
+        self.token = token or ""
+        self.skip = skip or set()
+        self.lock = threading.Lock()
+        self.lease_ids = itertools.count(1)
+        self.active = {}
+        # Host -> ids of the active leases still waiting for its result
+        self.outstanding = {}
+        self.requeued = []
+        self.exhausted = False
+        self.finished = threading.Event()
+        self.reassigned = 0
+        super().__init__(address, LeaseHandler)
+
+    def grant(self, holder):
+        """Return a new lease for `holder`, None if it should wait, or "done" when nothing is left."""
+        with self.lock:
+            self.expire()
+            hosts = self.requeued.pop() if self.requeued else self.take()
+            if hosts:
+                lease = Lease(next(self.lease_ids), hosts, holder, self.lease_timeout)
+                self.active[lease.id] = lease
+                for host in hosts:
+                    self.outstanding.setdefault(host, []).append(lease.id)
+                return lease
+            if self.active:
+                return None
+            self.finished.set()
+            return "done"
+
+    def take(self):
+        """Cut the next lease from the input, skipping hosts finished by an earlier run."""
+        hosts = []
+        while not self.exhausted and len(hosts) < self.lease_size:
+            host = next(self.source, None)
+            if host is None:
+                self.exhausted = True
+            elif host not in self.skip:
+                hosts.append(host)
+        return hosts
+
+    def expire(self):
+        now = time.monotonic()
+        for lease in [lease for lease in self.active.values() if lease.deadline < now]:
+            self.requeue(lease)
+
+    def requeue(self, lease):
+        self.retire(lease)
+        self.requeued.append(lease.hosts())
+        self.reassigned += 1
+        print_status(f"Lease {lease.id} timed out or lost its worker; reassigning its {len(self.requeued[-1])} unfinished hosts.", message_type="warning")
+
+    def retire(self, lease):
+        """Drop `lease` from the active set and from the outstanding-host index."""
+        del self.active[lease.id]
+        for host in lease.remaining:
+            lease_ids = self.outstanding[host]
+            lease_ids.remove(lease.id)
+            if not lease_ids:
+                del self.outstanding[host]
+
+    def accept(self, holder, lease_id, row):
+        """Write `row` if its host is still outstanding, crediting the reporting lease when possible."""
+        with self.lock:
+            host = row.get("Subdomain")
+            lease_ids = self.outstanding.get(host)
+            if not lease_ids:
+                return
+            lease = self.active[lease_id if lease_id in lease_ids else lease_ids[0]]
+            if lease.holder is holder:
+                lease.touch()
+            lease.remaining[host] -= 1
+            if not lease.remaining[host]:
+                del lease.remaining[host]
+                lease_ids.remove(lease.id)
+                if not lease_ids:
+                    del self.outstanding[host]
+            self.writer.write(row)
+            if not lease.remaining:
+                del self.active[lease.id]
+                if self.exhausted and not self.active and not self.requeued:
+                    self.finished.set()
+
+    def heartbeat(self, holder, lease_ids):
+        with self.lock:
+            for lease_id in lease_ids:
+                lease = self.active.get(lease_id)
+                if lease is not None and lease.holder is holder:
+                    lease.touch()
+
+    def release(self, holder):
+        with self.lock:
+            for lease in [lease for lease in self.active.values() if lease.holder is holder]:
+                self.requeue(lease)
+
+def run_coordinator(args, subdomain_list, output_file, address):
+    """Hand `subdomain_list` out to lease workers and merge their streamed rows into `output_file`."""
+    settings = ProbeSettings(args.probe_mode, args.max_redirects, args.connect_timeout, args.read_timeout,
+                             args.cluster, max(1, args.fingerprint_kb) * 1024, args.root_domains)
+    skip = completed_subdomains(output_file) if args.resume else set()
+    with open_result_writer(output_file, settings.fieldnames() + DNS_FIELDNAMES, append=args.resume) as writer:
+        server = LeaseCoordinator(parse_address(address), subdomain_list, writer,
+                                  {name: getattr(args, name) for name in LEASED_SETTINGS},
+                                  max(1, args.lease_size), args.lease_timeout, args.lease_token, skip)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        print_status(f"Coordinator listening on {address}; waiting for workers (--worker {address})...")
+        try:
+            with tqdm.tqdm(desc="Checking subdomains") as pbar:
+                while not server.finished.wait(0.5):
+                    with server.lock:
+                        server.expire()
+                    pbar.update(writer.rows_written - pbar.n)
+                pbar.update(writer.rows_written - pbar.n)
+        finally:
+            server.shutdown()
+            server.server_close()
+    print_status(f"All leases finished ({server.reassigned} reassigned); results saved to {output_file}")
+
+class LeaseClient:
+    """Worker side of the lease protocol: pulls hosts from a coordinator and streams rows back."""
+
+    def __init__(self, address, token=""):
+        self.connection = socket.create_connection(parse_address(address))
+        self.reader = self.connection.makefile('rb')
+        self.lock = threading.Lock()
+        self.owners = {}
+        self.held = {}
+        self.closed = threading.Event()
+        self.send({"type": "hello", "token": token or ""})
+        welcome = self.receive()
+        if welcome.get("type") != "welcome":
+            raise ConnectionError(welcome.get("message", "coordinator refused the connection"))
+        # Anything beyond the leased probe options could redirect the worker's files, so it is refused
+        unexpected = set(welcome["settings"]) - set(LEASED_SETTINGS)
+        if unexpected:
+            raise ValueError(f"coordinator sent settings outside the lease protocol: {', '.join(sorted(unexpected))}")
+        self.settings = welcome["settings"]
+        self.lease_timeout = welcome["lease_timeout"]
+
+    def send(self, message):
+        with self.lock:
+            self.connection.sendall((json.dumps(message) + "\n").encode())
+
+    def receive(self):
+        line = self.reader.readline()
+        if not line:
+            raise ConnectionError("coordinator closed the connection")
+        return json.loads(line)
+
+    def hosts(self):
+        """Yield leased hosts until the coordinator reports that every lease is done (or goes away)."""
+        while True:
+            try:
+                self.send({"type": "lease"})
+                message = self.receive()
+            except (OSError, ValueError):
+                # A finished coordinator shuts down; anything still unreported is its to reassign
+                return
+            if message["type"] == "done":
+                return
+            if message["type"] == "wait":
+                time.sleep(1)
+                continue
+            with self.lock:
+                self.held[message["id"]] = len(message["hosts"])
+                for host in message["hosts"]:
+                    self.owners.setdefault(host, []).append(message["id"])
+            yield from message["hosts"]
+
+    def report(self, result):
+        """Send one finished row back, tagged with the lease it belongs to."""
+        with self.lock:
+            owners = self.owners.get(result["Subdomain"])
+            if not owners:
+                return
+            lease_id = owners.pop(0)
+            if not owners:
+                del self.owners[result["Subdomain"]]
+            self.held[lease_id] -= 1
+            if not self.held[lease_id]:
+                del self.held[lease_id]
+        try:
+            self.send({"type": "result", "lease": lease_id, "row": result})
+        except OSError:
+            pass
+
+    def heartbeat_main(self, interval):
+        while not self.closed.wait(interval):
+            with self.lock:
+                lease_ids = list(self.held)
+            try:
+                self.send({"type": "heartbeat", "leases": lease_ids})
+            except OSError:
+                return
+
+    def close(self):
+        self.closed.set()
+        self.connection.close()
+
+def run_lease_worker(args, address, index=None):
+    """Probe hosts leased from a coordinator, writing a local CSV copy and streaming every row back."""
+    global SHARD_LABEL
+    if index is not None:
+        SHARD_LABEL = f"worker {index}"
+        shard_metrics(args, index)
+    try:
+        client = LeaseClient(address, args.lease_token)
+    except (OSError, ValueError) as e:
+        print_status(f"Could not join the coordinator at {address}: {e}", message_type="error")
+        return
+    # The coordinator decides the probe options so every worker produces the same columns
+    for name in LEASED_SETTINGS:
+        if name in client.settings:
+            setattr(args, name, client.settings[name])
+    args.resume = False
+    threading.Thread(target=client.heartbeat_main, args=(client.lease_timeout / 4,), daemon=True).start()
+    output_file = args.output if index is None else shard_path(args.output, index)
+    try:
+        run_scan(args, client.hosts(), output_file, ordered_input=False, shards=args.workers if index is not None else 1,
+                 on_result=client.report, validated=False)
+    finally:
+        client.close()
+        if index is not None:
+            finish_profile()
+
+def run_lease_workers(args, address):
+    """Run --workers lease workers on this machine, each with its own coordinator connection."""
+    if args.workers <= 1:
+        return run_lease_worker(args, address)
+    processes = [multiprocessing.Process(target=run_lease_worker, args=(args, address, index)) for index in range(args.workers)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+def main():
+    """Parse the command line and run the requested scan."""
+    global PROFILER
     parser = argparse.ArgumentParser(description="Subdomain enumeration and accessibility checker.")
-    parser.add_argument("-D", "--domain", help="Domain to enumerate subdomains for.")
-    parser.add_argument("-t", "--textfile", help="Path to the text file containing subdomains.")
+    parser.add_argument("-D", "--domain", help="Domain to enumerate subdomains for; separate several with commas.")
+    parser.add_argument("--domain-file", metavar="FILE", help="File of domains to enumerate, one per line (.gz supported, '-' reads stdin); combines with -D.")
+    parser.add_argument("--domain-concurrency", type=int, help="Domains enumerated at once in a multi-domain batch (default: 4).", default=4)
+    parser.add_argument("--engine-interval", type=float, help="Minimum seconds between two requests to the same search engine across all domains of a batch; Google, Baidu and Netcraft keep their longer delays (default: 1).", default=1)
+    parser.add_argument("-t", "--textfile", help="Path to the text file containing subdomains (.gz supported, '-' reads stdin).")
+    parser.add_argument("--bloom", type=int, metavar="CAPACITY", help="Dedupe the input with a Bloom filter sized for this many unique hosts instead of an exact set, for lists too big to hold in memory.")
+    parser.add_argument("--bloom-error", type=float, help="False-positive rate of --bloom: the share of unique hosts that may be skipped as duplicates (default: 0.001).", default=0.001)
     parser.add_argument("-o", "--output", help="Output CSV file to save results.", default=f"output_{int(time.time())}.csv")
+    parser.add_argument("--output-format", choices=["csv", "jsonl", "arrow", "parquet"], help="Format of the -o file; by default it follows the file extension (.csv, .jsonl, .arrow, .parquet) and falls back to CSV.")
+    parser.add_argument("--compress", choices=["gzip", "zstd"], help="Compress JSONL or Arrow output (adds .gz/.zst to -o; a .gz/.zst extension does the same).")
     parser.add_argument("-s", "--snapshots", help="Enable saving screenshots of accessible subdomains. Optionally specify a folder name.", nargs='?', const="snapshots")
-    parser.add_argument("-T", "--concurrency", type=int, help="Number of threads for concurrent checks (default: 10).", default=10)
+    parser.add_argument("-T", "--concurrency", type=int, help="Number of threads (thread engine) or in-flight probes (async engine) for concurrent checks (default: 10).", default=10)
+    parser.add_argument("--adaptive", action="store_true", help="Adjust the number of in-flight probes from observed latency and timeout rates, starting at -T.")
+    parser.add_argument("--min-concurrency", type=int, help="Lower bound for --adaptive (default: 5).", default=5)
+    parser.add_argument("--max-concurrency", type=int, help="Upper bound for --adaptive (default: 1000).", default=1000)
+    parser.add_argument("--per-ip-rate", type=float, help="Maximum probes per second to any single resolved IP (default: unlimited).")
+    parser.add_argument("--per-domain-rate", type=float, help="Maximum probes per second under any single registrable parent domain (default: unlimited).")
+    parser.add_argument("--rate-burst", type=int, help="Probes a quiet IP or parent domain may receive at once before its rate applies (default: 5).", default=5)
+    parser.add_argument("--workers", type=int, help="Shard the scan across this many processes, each with -T concurrent probes (default: 1).", default=1)
+    parser.add_argument("--coordinator", metavar="HOST:PORT", help="Distribute the -t/-D hosts to --worker processes connecting on HOST:PORT and merge their results into -o; a bare :PORT listens on 127.0.0.1 only, and other addresses need --lease-token.")
+    parser.add_argument("--worker", metavar="HOST:PORT", help="Run as a worker for the coordinator at HOST:PORT (no -t/-D needed).")
+    parser.add_argument("--lease-size", type=int, help="Hosts handed to a worker per lease (default: 500).", default=LEASE_SIZE)
+    parser.add_argument("--lease-timeout", type=float, help="Seconds without results or heartbeats before a worker's lease is reassigned; set on the coordinator (default: 120).", default=LEASE_TIMEOUT)
+    parser.add_argument("--lease-token", help="Shared secret workers must present to the coordinator.", default="")
+    parser.add_argument("--metrics-json", metavar="FILE", help="Write a JSON summary of throughput, per-phase latency histograms and errors to FILE at the end of the run.")
+    parser.add_argument("--prometheus", metavar="FILE", help="Keep FILE updated with the run's metrics in Prometheus text format (e.g. for node_exporter's textfile collector).")
+    parser.add_argument("--profile", metavar="DIR", help="Write per-stage CPU profiles (pstats and collapsed stacks) and tracemalloc snapshots to a new run directory under DIR.")
+    parser.add_argument("--engine", choices=["thread", "async"], help="Probe engine to use: a thread pool or a single asyncio event loop (default: thread).", default="thread")
+    parser.add_argument("--probe-mode", choices=["full", "headers"], help="'full' downloads each page; 'headers' stops at the response headers and records the final URL (default: full).", default="full")
+    parser.add_argument("--max-redirects", type=int, help="Maximum redirects to follow in headers probe mode (default: 5).", default=5)
+    parser.add_argument("--connect-timeout", type=float, help="Connect deadline in seconds for headers probe mode (default: 5).", default=5)
+    parser.add_argument("--read-timeout", type=float, help="Read deadline in seconds for headers probe mode; a whole probe, redirects included, ends after the connect and read deadlines combined (default: 10).", default=10)
+    parser.add_argument("--screenshot-workers", type=int, help="Number of long-lived headless Chrome instances used for screenshots (default: 4).", default=4)
+    parser.add_argument("--recycle-after", type=int, help="Restart each Chrome instance after this many pages (default: 50).", default=50)
+    parser.add_argument("--render-profile", choices=["full", "fast"], help="'full' waits for the whole page and saves a PNG; 'fast' uses an eager load, blocks heavy resources and saves a small compressed viewport image (default: full).", default="full")
+    parser.add_argument("--page-budget", type=float, help="Hard per-page time budget in seconds for the fast render profile (default: 4).", default=4)
+    parser.add_argument("--image-format", choices=["jpeg", "webp"], help="Image format for the fast render profile (default: jpeg).", default="jpeg")
+    parser.add_argument("--cluster", action="store_true", help="Fingerprint responses, flag wildcard/catch-all matches and screenshot one host per content cluster.")
+    parser.add_argument("--fingerprint-kb", type=int, help="Kilobytes of each response body used for fingerprinting (default: 8).", default=8)
+    parser.add_argument("--resolve-workers", type=int, help="Number of concurrent lookups in the async DNS pre-resolution stage (default: 200).", default=200)
+    parser.add_argument("--dns-cache", metavar="FILE", help="Persist the DNS cache to FILE so later runs reuse unexpired answers.")
+    parser.add_argument("--resume", action="store_true", help="Continue an interrupted scan: append to the existing output and skip hosts it already covers.")
+    parser.add_argument("--result-cache", metavar="FILE", help="SQLite file of earlier probe results; hosts with a fresh result there are not probed again.")
+    parser.add_argument("--cache-ttl", type=float, help="Hours a stored result stays fresh (default: 24).", default=24)
+    parser.add_argument("--cache-retention", type=float, help="Days before a stored result is evicted from the result cache (default: 30).", default=30)
+    parser.add_argument("--cache-max-rows", type=int, help="Maximum results kept in the result cache; the oldest are evicted first (default: 1000000).", default=1000000)
+    # Filled in once the domains of a multi-domain batch are known; leased to coordinator workers
+    parser.set_defaults(root_domains=None)
 
     args = parser.parse_args()
+    print(Fore.MAGENTA + ascii_art + Style.RESET_ALL)
 
-    if args.domain:
+    args.output, problem = resolve_output_file(args.output, args.output_format, args.compress)
+    if not problem and args.bloom is not None and (args.bloom < 1 or not 0 < args.bloom_error < 1):
+        problem = "--bloom needs a positive capacity and --bloom-error a rate between 0 and 1."
+    if not problem and args.coordinator:
+        try:
+            host, _ = parse_address(args.coordinator)
+        except ValueError:
+            problem = f"--coordinator needs HOST:PORT, not {args.coordinator}."
+        else:
+            # Anyone who can connect gets the target list and can submit rows
+            if not args.lease_token and not is_loopback(host):
+                problem = "--coordinator on a non-loopback address needs --lease-token."
+    if problem:
+        print_status(problem, message_type="error")
+        sys.exit(1)
+
+    if args.profile:
+        PROFILER = StageProfiler(os.path.join(args.profile, time.strftime("run_%Y%m%d_%H%M%S")))
+        # Exit handlers run last-in first-out: the files are written before the message
+        atexit.register(lambda: print_status(f"Profiles written to {PROFILER.directory}"))
+        atexit.register(finish_profile)
+
+    if args.worker:
+        run_lease_workers(args, args.worker)
+
+    elif args.domain or args.domain_file:
         output_file = args.output
-        if not output_file.endswith(".csv"):
+        if not split_output_extension(output_file)[1]:
             output_file += ".csv"
 
-        subdomains = run_sublist3r(args.domain)
-        if subdomains:
-            check_subdomains_concurrently(subdomains, output_file, args.snapshots, args.concurrency)
+        entries = [domain.strip() for domain in (args.domain or "").split(",") if domain.strip()]
+        if args.domain_file:
+            if args.domain_file != "-" and not os.path.exists(args.domain_file):
+                print(f"Error: File {args.domain_file} not found.")
+                sys.exit(1)
+            entries += iter_subdomains(args.domain_file)
+        roots = list(dict.fromkeys(canonical_batch(entries)))
+        if len(roots) < len(entries):
+            print_status(f"Skipped {len(entries) - len(roots)} invalid or duplicate domain(s).", message_type="warning")
+        if not roots:
+            print_status("No valid domains to enumerate.", message_type="error")
+            sys.exit(1)
+        # With several domains every row records which of them it was found under
+        args.root_domains = roots if len(roots) > 1 else None
+
+        # Probing starts with the first result while Sublist3r's engines are still running
+        found = iter_sublist3r(roots, args.domain_concurrency, args.engine_interval)
+        subdomains = normalize_subdomains(found, args.bloom, args.bloom_error, batch_size=1)
+        first = next(subdomains, None)
+        if first is not None:
+            run_scan(args, itertools.chain([first], subdomains), output_file, ordered_input=False)
         else:
             print_status("No subdomains found.")
 
     elif args.textfile:
-        if os.path.exists(args.textfile):
-            with open(args.textfile, 'r') as file:
-                subdomains = [line.strip() for line in file.readlines()]
-            if subdomains:
-                check_subdomains_concurrently(subdomains, args.output, args.snapshots, args.concurrency)
+        if args.textfile == "-" or os.path.exists(args.textfile):
+            # Stream the list instead of loading it, peeking once to detect an empty input
+            subdomains = normalize_subdomains(iter_subdomains(args.textfile), args.bloom, args.bloom_error)
+            first = next(subdomains, None)
+            if first is not None:
+                run_scan(args, itertools.chain([first], subdomains), args.output)
             else:
-                print_status("Subdomain list is empty.")
+                print_status("Subdomain list has no valid subdomains.")
         else:
             print(f"Error: File {args.textfile} not found.")
     else:
         parser.print_help()
         sys.exit(1)
 
+if __name__ == "__main__":
+    main()
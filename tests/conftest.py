@@ -0,0 +1,14 @@
+import os
+import importlib.util
+
+import pytest
+
+FINDER_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'finder_v1.7.py')
+
+@pytest.fixture(scope="session")
+def finder():
+    """The checker, imported as a module without running its command line."""
+    spec = importlib.util.spec_from_file_location("finder", FINDER_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,96 @@
+import time
+import socket
+import asyncio
+import threading
+import http.server
+
+import pytest
+
+# Seconds a slow sink blocks per call, and the longest pause the event loop may show meanwhile
+SINK_DELAY = 0.5
+MAX_LOOP_STALL = 0.2
+
+def closed_port():
+    """Return a local port with nothing listening, so every probe is refused at once."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+class QuietHandler(http.server.BaseHTTPRequestHandler):
+    """Answers 200 on / and 404 anywhere else, without logging."""
+
+    def do_GET(self):
+        self.send_response(200 if self.path == "/" else 404)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server_port():
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), QuietHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server.server_address[1]
+    server.shutdown()
+    server.server_close()
+
+def test_async_engine_rows_match_thread_engine(finder, monkeypatch, server_port):
+    hosts = [f"127.0.0.1:{server_port}", f"127.0.0.1:{closed_port()}", f"127.0.0.1:{server_port}/missing"]
+    # IP:port entries skip name validation, so the probes go straight to the local ports
+    monkeypatch.setattr(finder, "is_valid_subdomain", lambda subdomain: True)
+    expected = [finder.check_subdomain(host) for host in hosts]
+    assert [row["Status Code"] for row in expected] == [200, "N/A", 404]
+    rows = []
+    asyncio.run(finder.check_subdomains_async(hosts, 2, on_result=rows.append))
+    # Rows arrive in completion order
+    assert sorted(rows, key=lambda row: row["Subdomain"]) == sorted(expected, key=lambda row: row["Subdomain"])
+
+def test_invalid_names_are_not_probed(finder):
+    rows = []
+    asyncio.run(finder.check_subdomains_async(["no_dots"], 1, on_result=rows.append))
+    assert rows == [{"Subdomain": "no_dots", "Status Code": "Invalid", "Accessible": "No"}]
+
+async def longest_stall(work):
+    """Run `work` alongside a ticker and return the longest gap between two of its ticks."""
+    gaps = []
+
+    async def ticker():
+        last = time.monotonic()
+        while True:
+            await asyncio.sleep(0.01)
+            now = time.monotonic()
+            gaps.append(now - last)
+            last = now
+
+    ticking = asyncio.ensure_future(ticker())
+    try:
+        await work
+    finally:
+        ticking.cancel()
+    return max(gaps)
+
+def slow_sink(received):
+    def sink(*args):
+        time.sleep(SINK_DELAY)
+        received.append(args)
+    return sink
+
+def test_slow_result_sink_does_not_block_probe_loop(finder, monkeypatch):
+    hosts = [f"127.0.0.1:{closed_port()}"] * 4
+    received = []
+    settings = finder.ProbeSettings(mode="headers", connect_timeout=1, read_timeout=1)
+    # IP:port entries skip name validation, so the probes go straight to the closed port
+    monkeypatch.setattr(finder, "is_valid_subdomain", lambda subdomain: True)
+    stall = asyncio.run(longest_stall(finder.check_subdomains_async(hosts, 4, settings, on_result=slow_sink(received))))
+    assert len(received) == len(hosts)
+    assert stall < MAX_LOOP_STALL
+
+def test_slow_resolved_sink_does_not_block_resolve_loop(finder):
+    # Single labels are invalid and passed straight to on_resolved without a lookup
+    names = ["alpha", "bravo", "charlie", "delta"]
+    received = []
+    stall = asyncio.run(longest_stall(finder.resolve_subdomains_async(names, 4, slow_sink(received), slow_sink(received))))
+    assert sorted(name for name, _ in received) == names
+    assert stall < MAX_LOOP_STALL
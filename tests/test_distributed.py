@@ -0,0 +1,39 @@
+import os
+import sys
+import json
+import socket
+import threading
+import subprocess
+
+import pytest
+
+LAUNCHER_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'finder.py')
+
+def test_bare_port_binds_loopback(finder):
+    assert finder.parse_address(":7700") == ("127.0.0.1", 7700)
+    assert finder.parse_address("[::1]:7700") == ("::1", 7700)
+    assert finder.is_loopback("127.0.0.1") and finder.is_loopback("::1") and finder.is_loopback("localhost")
+    assert not finder.is_loopback("0.0.0.0") and not finder.is_loopback("coordinator.example.com")
+
+def test_public_coordinator_needs_a_token(tmp_path):
+    hosts = tmp_path / "hosts.txt"
+    hosts.write_text("www.example.com\n")
+    completed = subprocess.run([sys.executable, LAUNCHER_PATH, "-t", str(hosts), "--coordinator", "0.0.0.0:1"],
+                               capture_output=True, text=True, cwd=tmp_path, timeout=60)
+    assert completed.returncode == 1
+    assert "--lease-token" in completed.stdout
+
+def test_worker_refuses_settings_outside_the_lease(finder):
+    server = socket.create_server(("127.0.0.1", 0))
+
+    def coordinator():
+        connection, _ = server.accept()
+        with connection, connection.makefile('rb') as reader:
+            reader.readline()
+            welcome = {"type": "welcome", "lease_timeout": 120,
+                       "settings": {"probe_mode": "full", "output": "/tmp/overwritten.csv"}}
+            connection.sendall((json.dumps(welcome) + "\n").encode())
+
+    threading.Thread(target=coordinator, daemon=True).start()
+    with server, pytest.raises(ValueError, match="output"):
+        finder.LeaseClient(f"127.0.0.1:{server.getsockname()[1]}")
@@ -0,0 +1,38 @@
+import socket
+import time
+
+def test_entries_expire(finder):
+    cache = finder.DNSCache()
+    cache.put("WWW.Example.com", {"A": "192.0.2.1", "AAAA": "", "CNAME": ""}, time.time() + 60)
+    cache.put("gone.example.com", None, time.time() + 60)
+    cache.put("old.example.com", {"A": "192.0.2.2", "AAAA": "", "CNAME": ""}, time.time() - 1)
+    assert cache.get("www.example.com") == (True, {"A": "192.0.2.1", "AAAA": "", "CNAME": ""})
+    # A cached NXDOMAIN is found, with no records
+    assert cache.get("gone.example.com") == (True, None)
+    assert cache.get("old.example.com") == (False, None)
+    assert "old.example.com" not in cache.entries
+
+def test_saved_entries_survive_a_restart(finder, tmp_path):
+    path = str(tmp_path / "dns.json")
+    cache = finder.DNSCache(path)
+    cache.put("www.example.com", {"A": "192.0.2.1", "AAAA": "", "CNAME": ""}, time.time() + 60)
+    cache.put("old.example.com", {"A": "192.0.2.2", "AAAA": "", "CNAME": ""}, time.time() - 1)
+    cache.save()
+    restarted = finder.DNSCache(path)
+    assert list(restarted.entries) == ["www.example.com"]
+    assert restarted.get("www.example.com")[1]["A"] == "192.0.2.1"
+
+def test_connections_fall_back_to_the_next_address(finder):
+    cache = finder.DNS_CACHE
+    cache.put("multi.example.com", {"A": "127.0.0.3 127.0.0.1", "AAAA": "::1", "CNAME": ""}, time.time() + 60)
+    try:
+        assert cache.addresses("multi.example.com") == ["127.0.0.3", "127.0.0.1", "::1"]
+        assert cache.addresses("missing.example.com") == []
+        finder.install_requests_dns_cache()
+        with socket.create_server(("127.0.0.1", 0)) as server:
+            port = server.getsockname()[1]
+            # Nothing listens on 127.0.0.3, so the connection goes to the second address
+            with finder.urllib3.util.connection.create_connection(("multi.example.com", port), timeout=2) as sock:
+                assert sock.getpeername() == ("127.0.0.1", port)
+    finally:
+        cache.entries.pop("multi.example.com", None)
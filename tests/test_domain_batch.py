@@ -0,0 +1,24 @@
+import time
+
+def test_root_domain_prefers_the_longest_root(finder):
+    roots = ["example.com", "shop.example.com", "example.org"]
+    assert finder.root_domain("a.shop.example.com", roots) == "shop.example.com"
+    assert finder.root_domain("WWW.Example.com.", roots) == "example.com"
+    assert finder.root_domain("example.org", roots) == "example.org"
+    assert finder.root_domain("example.net", roots) == ""
+
+def test_root_domain_column_only_for_batches(finder):
+    assert "Root Domain" not in finder.ProbeSettings().fieldnames()
+    assert finder.ProbeSettings(root_domains=["a.com", "b.com"]).fieldnames()[-1] == "Root Domain"
+
+def test_engine_gate_spaces_requests_per_engine(finder):
+    gate = finder.EngineGate(0.2, {"Google": 0.3})
+    started = time.monotonic()
+    gate("Google")
+    gate("Bing")
+    # Neither engine has waited yet, and unknown engines are never held
+    gate("NoSuchEngine")
+    assert time.monotonic() - started < 0.1
+    gate("Google")
+    gate("Bing")
+    assert time.monotonic() - started >= 0.3
@@ -0,0 +1,61 @@
+import time
+import asyncio
+import threading
+import socketserver
+
+import pytest
+
+# Every probe gets one second to connect and one to read, so two seconds in all
+TIMEOUTS = {"connect_timeout": 1, "read_timeout": 1}
+DEADLINE_SLACK = 1
+
+class SlowHandler(socketserver.BaseRequestHandler):
+    """Drips header lines slower than any sane server, or answers every hop with a slow redirect."""
+
+    def handle(self):
+        try:
+            if self.server.mode == "drip":
+                self.request.sendall(b"HTTP/1.1 200 OK\r\n")
+                for _ in range(100):
+                    time.sleep(0.2)
+                    self.request.sendall(b"X-Drip: 1\r\n")
+            else:
+                self.request.recv(65536)
+                time.sleep(0.8)
+                self.request.sendall(b"HTTP/1.1 302 Found\r\nLocation: /next\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+        except OSError:
+            pass
+
+@pytest.fixture(params=["drip", "redirects"])
+def slow_server(request):
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), SlowHandler)
+    server.daemon_threads = True
+    server.mode = request.param
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def expected_status(server):
+    # A chain cut short keeps the last hop that answered
+    return "N/A" if server.mode == "drip" else 302
+
+def test_thread_probe_ends_at_its_deadline(finder, slow_server):
+    finder.install_requests_timing()
+    settings = finder.ProbeSettings(mode="headers", max_redirects=5, **TIMEOUTS)
+    started = time.monotonic()
+    result = finder.check_subdomain_headers(f"127.0.0.1:{slow_server.server_address[1]}", settings)
+    assert time.monotonic() - started < settings.header_deadline() + DEADLINE_SLACK
+    assert result["Status Code"] == expected_status(slow_server)
+
+def test_async_probe_ends_at_its_deadline(finder, slow_server):
+    settings = finder.ProbeSettings(mode="headers", max_redirects=5, **TIMEOUTS)
+
+    async def probe():
+        async with finder.aiohttp.ClientSession() as session:
+            return await finder.check_subdomain_headers_async(session, f"127.0.0.1:{slow_server.server_address[1]}", settings)
+
+    started = time.monotonic()
+    result = asyncio.run(probe())
+    assert time.monotonic() - started < settings.header_deadline() + DEADLINE_SLACK
+    assert result["Status Code"] == expected_status(slow_server)
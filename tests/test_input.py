@@ -0,0 +1,25 @@
+import gzip
+import itertools
+
+def test_plain_and_gzipped_lists_yield_the_same_entries(finder, tmp_path):
+    text = "a.example.com\n\n  b.example.com  \nc.example.com"
+    plain = tmp_path / "hosts.txt"
+    plain.write_text(text, encoding="utf-8")
+    packed = tmp_path / "hosts.txt.gz"
+    with gzip.open(packed, "wt", encoding="utf-8") as file:
+        file.write(text)
+
+    expected = ["a.example.com", "b.example.com", "c.example.com"]
+    assert list(finder.iter_subdomains(str(plain))) == expected
+    assert list(finder.iter_subdomains(str(packed))) == expected
+
+def test_stdin_is_read_one_line_at_a_time(finder, monkeypatch):
+    read = []
+    # An endless stdin would never finish if the list were read up front
+    endless = (read.append(n) or f"host{n}.example.com\n" for n in itertools.count())
+    monkeypatch.setattr(finder.sys, "stdin", endless)
+
+    subdomains = finder.iter_subdomains("-")
+    assert next(subdomains) == "host0.example.com"
+    assert next(subdomains) == "host1.example.com"
+    assert len(read) == 2
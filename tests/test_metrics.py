@@ -0,0 +1,33 @@
+def test_quantiles_interpolate_inside_a_bucket(finder):
+    histogram = finder.LatencyHistogram(bounds=(0.1, 1.0))
+    for seconds in (0.05, 0.05, 0.5, 0.5):
+        histogram.observe(seconds)
+    assert histogram.count == 4 and histogram.max == 0.5
+    assert histogram.quantile(0.5) <= 0.1
+    assert 0.1 < histogram.quantile(0.99) <= 0.5
+    assert finder.LatencyHistogram().quantile(0.5) == 0.0
+
+def test_prometheus_buckets_are_cumulative(finder):
+    metrics = finder.ScanMetrics()
+    metrics.count("probes", 3)
+    metrics.error("probe", finder.requests.Timeout())
+    for seconds in (0.001, 0.2, 100.0):
+        metrics.observe("probe", seconds)
+    text = metrics.prometheus_text()
+    assert 'finder_events_total{event="probes"} 3' in text
+    assert 'finder_errors_total{stage="probe",type="Timeout"} 1' in text
+    assert 'finder_phase_seconds_bucket{phase="probe",le="+Inf"} 3' in text
+    assert 'finder_phase_seconds_count{phase="probe"} 3' in text
+    summary = metrics.summary()
+    assert summary["phases"]["probe"]["count"] == 3 and summary["phases"]["probe"]["max"] == 100.0
+
+def test_unrecorded_blocks_leave_no_trace(finder):
+    metrics = finder.ScanMetrics()
+    with metrics.unrecorded():
+        metrics.count("probes")
+        metrics.observe("probe", 0.1)
+        with metrics.track("probe"):
+            pass
+    metrics.count("probes")
+    summary = metrics.summary()
+    assert summary["counters"] == {"probes": 1} and summary["phases"] == {}
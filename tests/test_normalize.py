@@ -0,0 +1,29 @@
+import csv
+
+def test_canonical_batch(finder):
+    batch = ["WWW.Example.com", "x.example.com..", "bücher.example.com", "a.example.com\nb.example.com", "-bad.example.com", "nodot"]
+    assert finder.canonical_batch(batch) == ["www.example.com", "x.example.com", "xn--bcher-kva.example.com"]
+
+def test_normalize_dedupes_in_order(finder):
+    entries = ["Foo.example.com", "foo.example.com.", "bar.example.com", "foo.example.com", "not valid"]
+    assert list(finder.normalize_subdomains(entries, batch_size=2)) == ["foo.example.com", "bar.example.com"]
+    assert list(finder.normalize_subdomains(entries, bloom_capacity=100)) == ["foo.example.com", "bar.example.com"]
+
+def test_bloom_filter_counts_new_names(finder):
+    bloom = finder.BloomFilter(1000, 0.01)
+    for index in range(1000):
+        bloom.add(f"host{index}.example.com")
+    bloom.add("host0.example.com")
+    # A false positive can only lower the count, at about the configured rate
+    assert 980 <= len(bloom) <= 1000
+    assert len(bloom.bits) * 8 < 1000 * 10
+
+def test_validated_scan_skips_name_checks(finder, monkeypatch, tmp_path):
+    calls = []
+    monkeypatch.setattr(finder, "is_valid_subdomain", lambda subdomain: calls.append(subdomain) or True)
+    output = tmp_path / "out.csv"
+    finder.check_subdomains_concurrently(["127.0.0.1", "127.0.0.2"], str(output), scan_settings=finder.ScanSettings(2, validated=True),
+                                         screenshot_settings=finder.ScreenshotSettings(workers=0))
+    with open(output, newline='', encoding='utf-8') as file:
+        assert sorted(row["Subdomain"] for row in csv.DictReader(file)) == ["127.0.0.1", "127.0.0.2"]
+    assert calls == []
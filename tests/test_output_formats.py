@@ -0,0 +1,48 @@
+import pytest
+
+ROWS = [{"Subdomain": f"host{index}.example.com", "Status Code": "200", "Accessible": "Yes"} for index in range(5)]
+
+def test_arrow_stream_loads_in_pyarrow(finder, tmp_path):
+    pyarrow = pytest.importorskip("pyarrow")
+    path = str(tmp_path / "out.arrow")
+    with finder.open_result_writer(path, finder.CSV_FIELDNAMES) as writer:
+        for row in ROWS[:3]:
+            writer.write(row)
+        writer.flush()
+        for row in ROWS[3:]:
+            writer.write(row)
+    with pyarrow.memory_map(path) as source:
+        table = pyarrow.ipc.open_stream(source).read_all()
+    assert table.schema.names == finder.CSV_FIELDNAMES
+    assert table.to_pylist() == ROWS
+
+def test_parquet_writes_a_row_group_per_batch(finder, tmp_path):
+    pytest.importorskip("pyarrow")
+    import pyarrow.parquet
+    path = str(tmp_path / "out.parquet")
+    with finder.open_result_writer(path, finder.CSV_FIELDNAMES) as writer:
+        for row in ROWS[:3]:
+            writer.write(row)
+        writer.flush()
+        for row in ROWS[3:]:
+            writer.write(row)
+    parquet = pyarrow.parquet.ParquetFile(path)
+    assert parquet.num_row_groups == 2
+    assert parquet.read().to_pylist() == ROWS
+    assert not (tmp_path / "out.parquet.spool.arrow").exists()
+
+def test_parquet_resume_recovers_the_journal(finder, tmp_path):
+    pytest.importorskip("pyarrow")
+    path = str(tmp_path / "out.parquet")
+    with finder.open_result_writer(path, finder.CSV_FIELDNAMES) as writer:
+        writer.write(ROWS[0])
+    # A crash leaves the journal of the rows flushed since the last finished output
+    crashed = finder.open_result_writer(path, finder.CSV_FIELDNAMES, append=True)
+    crashed.write(ROWS[1])
+    crashed.flush()
+    crashed.file.close()
+    crashed.parquet.close()
+    with finder.open_result_writer(path, finder.CSV_FIELDNAMES, append=True) as writer:
+        assert [row["Subdomain"] for row in finder.read_results(path)] == [row["Subdomain"] for row in ROWS[:2]]
+        writer.write(ROWS[2])
+    assert list(finder.read_results(path)) == ROWS[:3]
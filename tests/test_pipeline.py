@@ -0,0 +1,51 @@
+import queue
+import threading
+
+def test_growable_stage_grows_and_drains(finder):
+    inbox = queue.Queue()
+    handled = []
+    lock = threading.Lock()
+
+    def handle(item):
+        with lock:
+            handled.append(item)
+        # The first items grow the stage while it is running
+        if item < 3:
+            stage.grow(2 + item * 2)
+
+    stage = finder.PipelineStage("Test", 2, handle, inbox, growable=True)
+    stage.start()
+    for item in range(50):
+        inbox.put(item)
+    # A growable stage needs one end marker however many workers it has
+    inbox.put(finder._STAGE_DONE)
+    stage.join()
+    assert sorted(handled) == list(range(50))
+    assert len(stage.threads) == 6
+    assert not any(thread.is_alive() for thread in stage.threads)
+    # Once finished, the stage does not grow again
+    stage.grow(10)
+    assert len(stage.threads) == 6
+
+def test_adaptive_thread_engine_starts_at_initial_limit(finder, tmp_path, monkeypatch):
+    started = []
+    original = finder.PipelineStage.start
+
+    def recording_start(stage):
+        started.append((stage.name, len(stage.threads)))
+        return original(stage)
+
+    monkeypatch.setattr(finder.PipelineStage, "start", recording_start)
+    limiter = finder.AdaptiveConcurrency(4, 2, 1000)
+    # Single labels are invalid, so nothing touches the network
+    finder.check_subdomains_concurrently(["alpha", "bravo"], str(tmp_path / "out.csv"),
+                                         scan_settings=finder.ScanSettings(4, limiter=limiter))
+    assert ("Probe", 4) in started
+
+def test_headers_probe_timeout_uses_the_whole_deadline(finder):
+    settings = finder.ProbeSettings(mode="headers", connect_timeout=2, read_timeout=8)
+    failed = {"Subdomain": "www.example.com", "Status Code": "N/A", "Accessible": "No"}
+    # Failing 3 s in is past the connect timeout but well short of the 10 s header deadline
+    assert not finder.is_probe_timeout(failed, 3, settings)
+    assert finder.is_probe_timeout(failed, 9.5, settings)
+    assert finder.is_probe_timeout(None, 0, settings)
@@ -0,0 +1,31 @@
+import contextlib
+import os
+import threading
+import tracemalloc
+
+def busy_work():
+    return sum(i * i for i in range(200000))
+
+def test_profiled_is_free_when_profiling_is_off(finder):
+    assert finder.PROFILER is None
+    assert isinstance(finder.profiled("probe"), contextlib.nullcontext)
+
+def test_stage_profiles_are_written_per_stage(finder, tmp_path):
+    profiler = finder.StageProfiler(str(tmp_path), label="part0")
+    try:
+        def worker():
+            with profiler.stage("probe"):
+                busy_work()
+        threads = [threading.Thread(target=worker) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        profiler.finish()
+    finally:
+        tracemalloc.stop()
+    written = set(os.listdir(tmp_path))
+    assert {"probe-part0.tracemalloc", "probe-part0.memory.txt"} <= written
+    # cProfile is skipped where another profiler is already active; the sampler does not depend on it
+    assert "probe-part0.pstats" in written or "probe-part0.collapsed" in written
+    assert profiler.running["probe"] == 0 and not profiler.thread_stages
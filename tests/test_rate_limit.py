@@ -0,0 +1,43 @@
+import time
+import queue
+
+import pytest
+
+def test_registrable_domain(finder):
+    assert finder.registrable_domain("a.b.Example.com.") == "example.com"
+    assert finder.registrable_domain("shop.example.co.uk") == "example.co.uk"
+
+def test_bucket_refills_at_its_rate(finder):
+    bucket = finder.TokenBucket(rate=10, burst=2)
+    now = bucket.updated
+    assert bucket.wait_time(now) == 0
+    bucket.tokens = 0
+    assert bucket.wait_time(now) == pytest.approx(0.1)
+    assert bucket.wait_time(now + 0.1) == 0
+    # Idle time never fills the bucket past its burst
+    assert bucket.wait_time(now + 60) == 0 and bucket.tokens == 2
+
+def test_host_needs_both_its_ip_and_its_domain_token(finder):
+    limiter = finder.HostRateLimiter(ip_rate=1, ip_burst=1, domain_rate=1, domain_burst=2)
+    assert limiter.reserve("192.0.2.1", "example.com") == 0
+    # Same edge IP, other domain: the IP bucket is empty, and the domain keeps its token
+    assert limiter.reserve("192.0.2.1", "example.org") > 0
+    assert limiter.domain_buckets["example.org"].tokens == 2
+    assert limiter.reserve("192.0.2.2", "example.com") == 0
+    # Third host of the same domain on a fresh IP: the domain's burst is used up
+    assert limiter.reserve("192.0.2.3", "example.com") > 0
+
+def test_scheduler_passes_other_hosts_while_one_waits(finder):
+    limiter = finder.HostRateLimiter(ip_rate=5, ip_burst=1, domain_rate=100, domain_burst=100)
+    inbox, outbox = queue.Queue(), queue.Queue()
+    scheduler = finder.RateLimitScheduler(limiter, inbox, outbox).start()
+    started = time.monotonic()
+    for item in [("a.example.com", {"A": "192.0.2.1"}), ("b.example.com", {"A": "192.0.2.1"}),
+                 ("c.example.org", {"A": "192.0.2.9"})]:
+        inbox.put(item)
+    inbox.put(finder._STAGE_DONE)
+    scheduler.join()
+    released = [item[0] for item in finder.iter_queue(outbox)]
+    # b shares a's IP, so it is parked until the IP refills and c goes ahead of it
+    assert released == ["a.example.com", "c.example.org", "b.example.com"]
+    assert time.monotonic() - started >= 0.15
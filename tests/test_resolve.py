@@ -0,0 +1,17 @@
+import asyncio
+
+def test_hosts_file_entries_are_grouped_by_family(finder, tmp_path):
+    path = tmp_path / "hosts"
+    path.write_text("# comment\n10.0.0.5  app.internal  App.Example.test\nfe80::1 app.internal\n\n", encoding="utf-8")
+    assert finder.load_hosts_file(str(path)) == {
+        "app.internal": {"A": ["10.0.0.5"], "AAAA": ["fe80::1"]},
+        "app.example.test": {"A": ["10.0.0.5"], "AAAA": []},
+    }
+
+def test_ip_literals_and_hosts_entries_need_no_lookup(finder):
+    hosts = {"app.internal": {"A": ["10.0.0.5", "10.0.0.6"], "AAAA": []}}
+    # No resolver: any real lookup would fail
+    resolve = lambda name: asyncio.run(finder.resolve_records_async(None, name, hosts))
+    assert resolve("192.0.2.7") == {"A": "192.0.2.7", "AAAA": "", "CNAME": ""}
+    assert resolve("2001:db8::1") == {"A": "", "AAAA": "2001:db8::1", "CNAME": ""}
+    assert resolve("APP.internal") == {"A": "10.0.0.5 10.0.0.6", "AAAA": "", "CNAME": ""}
@@ -0,0 +1,35 @@
+import csv
+import json
+
+# IP literals need no DNS, and a refused or answered probe both give a row
+HOSTS = [f"127.0.0.{index}" for index in range(1, 9)]
+
+def rows_by_host(path):
+    with open(path, newline='', encoding='utf-8') as file:
+        hosts = [row["Subdomain"] for row in csv.DictReader(file)]
+    return {host: hosts.count(host) for host in hosts}
+
+def test_resume_after_crash_checks_every_host_once(finder, tmp_path):
+    output = tmp_path / "out.csv"
+    # State after a crash: rows were written past the last checkpoint, the last one torn mid-line
+    rows = "".join(f"{host},N/A,No,,,\n" for host in HOSTS[:5])
+    output.write_text("Subdomain,Status Code,Accessible,A,AAAA,CNAME\n" + rows + "127.0.0.6,N/")
+    (tmp_path / "out.csv.checkpoint").write_text(json.dumps({"position": 2, "pending": [HOSTS[1]], "saved_at": 0}))
+
+    finder.check_subdomains_concurrently(HOSTS, str(output), scan_settings=finder.ScanSettings(4, resume=True),
+                                         screenshot_settings=finder.ScreenshotSettings(workers=0))
+    assert rows_by_host(output) == {host: 1 for host in HOSTS}
+    assert not (tmp_path / "out.csv.checkpoint").exists()
+
+def test_writers_append_or_truncate(finder, tmp_path):
+    row = {"Subdomain": "www.example.com", "Status Code": 200, "Accessible": "Yes"}
+    for name in ("out.csv", "out.jsonl"):
+        path = str(tmp_path / name)
+        with finder.open_result_writer(path, finder.CSV_FIELDNAMES) as writer:
+            writer.write(row)
+        with finder.open_result_writer(path, finder.CSV_FIELDNAMES, append=True) as writer:
+            writer.write(row)
+        assert [result["Subdomain"] for result in finder.read_results(path)] == ["www.example.com"] * 2
+        with finder.open_result_writer(path, finder.CSV_FIELDNAMES) as writer:
+            writer.write(row)
+        assert len(list(finder.read_results(path))) == 1
@@ -0,0 +1,29 @@
+def test_pool_reports_captures_already_in_its_folder(finder, tmp_path):
+    settings = finder.ScreenshotSettings(workers=0, profile="fast", image_format="webp")
+    with finder.ScreenshotPool(str(tmp_path), settings) as pool:
+        assert not pool.captured("www.example.com")
+        (tmp_path / "www_example_com.webp").write_bytes(b"")
+        assert pool.captured("www.example.com")
+        # A capture in another format, e.g. from a full-profile run, does not count
+        assert not pool.captured("api.example.com")
+        (tmp_path / "api_example_com.png").write_bytes(b"")
+        assert not pool.captured("api.example.com")
+
+def test_cached_accessible_hosts_are_captured_when_missing(finder, tmp_path, monkeypatch):
+    submitted = []
+
+    class RecordingPool(finder.ScreenshotPool):
+        def submit(self, subdomain):
+            submitted.append(subdomain)
+
+    monkeypatch.setattr(finder, "ScreenshotPool", RecordingPool)
+    folder = tmp_path / "snapshots"
+    folder.mkdir()
+    (folder / "old_example_com.png").write_bytes(b"")
+    hosts = ["old.example.com", "new.example.com"]
+    with finder.ResultStore(str(tmp_path / "results.db")) as store:
+        for host in hosts:
+            store.put({"Subdomain": host, "Status Code": 200, "Accessible": "Yes"})
+        finder.check_subdomains_concurrently(hosts, str(tmp_path / "out.csv"), str(folder),
+                                             screenshot_settings=finder.ScreenshotSettings(workers=1), result_store=store)
+    assert submitted == ["new.example.com"]
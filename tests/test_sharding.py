@@ -0,0 +1,14 @@
+import collections
+
+def test_hosts_keep_their_shard(finder):
+    hosts = [f"host{n}.example.com" for n in range(400)]
+    first = [finder.shard_index(host, 4) for host in hosts]
+    # A resumed run must send every host to the shard, and part file, it had before
+    assert [finder.shard_index(host.upper(), 4) for host in hosts] == first
+    counts = collections.Counter(first)
+    assert sorted(counts) == [0, 1, 2, 3]
+    assert min(counts.values()) > 50
+
+def test_part_files_sit_next_to_the_output(finder):
+    assert finder.shard_path("scan/results.csv", 2) == "scan/results.part2.csv"
+    assert finder.shard_path("results", 0) == "results.part0.csv"
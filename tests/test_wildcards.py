@@ -0,0 +1,43 @@
+import asyncio
+
+import pytest
+
+@pytest.mark.parametrize("subdomain", ["192.0.2.7", "2001:db8::1", "example.com"])
+def test_no_wildcard_parent(finder, subdomain):
+    assert finder.random_sibling(subdomain) is None
+    assert finder.wildcard_baseline(subdomain, finder.ProbeSettings(fingerprint=True)) == ""
+
+def test_sibling_shares_the_parent(finder):
+    parent, sibling = finder.random_sibling("www.example.co.uk")
+    assert parent == "example.co.uk"
+    assert sibling.endswith(".example.co.uk") and sibling != "www.example.co.uk"
+
+def failing_probe(finder):
+    """Return a probe that times out the way a real one records it."""
+    def probe(*args):
+        finder.count_probe_error(finder.requests.Timeout("baseline"))
+        finder.METRICS.observe("first_byte", 1.0)
+        return {"Cluster": ""}
+    return probe
+
+def test_thread_baseline_is_not_counted(finder, monkeypatch):
+    monkeypatch.setattr(finder, "probe_subdomain", failing_probe(finder))
+    finder.METRICS.reset()
+    assert finder.wildcard_baseline("www.unrecorded-thread.example", finder.ProbeSettings(fingerprint=True)) == ""
+    summary = finder.METRICS.summary()
+    assert summary["errors"] == {} and "timeouts" not in summary["counters"] and summary["phases"] == {}
+
+def test_async_baseline_is_not_counted(finder, monkeypatch):
+    probe = failing_probe(finder)
+
+    async def failing_probe_async(*args):
+        return probe(*args)
+
+    monkeypatch.setattr(finder, "probe_subdomain_async", failing_probe_async)
+    finder.METRICS.reset()
+    asyncio.run(finder.unrecorded_probe_async(None, "x.unrecorded-async.example", finder.ProbeSettings(fingerprint=True)))
+    summary = finder.METRICS.summary()
+    assert summary["errors"] == {} and "timeouts" not in summary["counters"] and summary["phases"] == {}
+    # Outside the baseline everything is counted again
+    finder.count_probe_error(finder.requests.Timeout("probe"))
+    assert finder.METRICS.summary()["counters"]["timeouts"] == 1